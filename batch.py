@@ -0,0 +1,136 @@
+# batch.py
+"""Run many prompts in one process: python main.py --batch prompts.jsonl
+
+Each input line is a JSON string or an object {"prompt", "id", "until",
+"max_iterations"}; the id defaults to the line number. Up to --concurrency
+sessions run at once, sharing the API client, the rate limiter and the
+tool cache (entries are checked against the file's stat on every hit, and
+writes invalidate them, so one session never sees another's stale read).
+
+One JSON line per prompt is appended to the results file as soon as that
+session ends, in completion order. On restart, prompts whose id is already
+in the results file without an error are skipped, so an interrupted batch
+resumes where it stopped and failed prompts get another try.
+"""
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Set
+
+from functions.session_output import redirect
+from main import VERIFIERS, Session, make_client, run_session, shared_api_client
+
+
+def read_prompts(path: str) -> List[Dict[str, Any]]:
+    prompts = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"prompt": item}
+            item.setdefault("id", str(number))
+            item["id"] = str(item["id"])
+            prompts.append(item)
+    return prompts
+
+
+def completed_ids(path: str) -> Set[str]:
+    """Ids that finished without an error; drops a torn last line from a crash."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb") as f:
+        data = f.read()
+    if data and not data.endswith(b"\n"):
+        with open(path, "r+b") as f:
+            f.truncate(data.rfind(b"\n") + 1)
+        data = data[:data.rfind(b"\n") + 1]
+    done = set()
+    for line in data.splitlines():
+        try:
+            result = json.loads(line)
+            if not result.get("error"):
+                done.add(str(result["id"]))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            continue
+    return done
+
+
+class _ResultWriter:
+    def __init__(self, path: str) -> None:
+        self._f = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._f.write(json.dumps(result, default=str) + "\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())  # a line on disk is a prompt we never rerun
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _run_one(item: Dict[str, Any], options: Any, api_client: Any) -> Dict[str, Any]:
+    session = Session(until=item.get("until") or options.until,
+                      max_iterations=item.get("max_iterations") or options.max_iterations,
+                      tool_workers=options.tool_workers)
+    output = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with redirect(output):
+            summary = run_session(make_client(options, api_client), item["prompt"], session,
+                                  stream=options.stream, verbose=options.verbose)
+    except Exception as exc:
+        summary = {"session": session.id, "error": f"session failed: {exc}",
+                   "elapsed_s": round(time.perf_counter() - started, 3)}
+    result = {"id": item["id"], "prompt": item["prompt"], **summary}
+    if options.verbose:
+        result["output"] = output.getvalue()
+    return result
+
+
+def run_batch(options: Any) -> int:
+    try:
+        prompts = read_prompts(options.batch)
+    except (OSError, ValueError) as exc:
+        print(f"Cannot read {options.batch}: {exc}")
+        return 1
+    bad = [p["id"] for p in prompts if "prompt" not in p or (p.get("until") and p["until"] not in VERIFIERS)]
+    if bad:
+        print(f"Invalid prompt line(s): {', '.join(bad)}")
+        return 1
+    out_path = options.batch_out or os.path.splitext(options.batch)[0] + ".results.jsonl"
+    done = completed_ids(out_path)
+    todo = [p for p in prompts if p["id"] not in done]
+    print(f"{len(prompts)} prompt(s), {len(prompts) - len(todo)} already in {out_path}, "
+          f"running {len(todo)} with up to {options.concurrency} at once")
+    if not todo:
+        return 0
+
+    api_client = shared_api_client(options)
+    writer = _ResultWriter(out_path)
+    failed = 0
+    started = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=options.concurrency, thread_name_prefix="batch")
+    try:
+        futures = [pool.submit(_run_one, item, options, api_client) for item in todo]
+        for finished, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            writer.write(result)
+            failed += bool(result.get("error"))
+            status = f"error: {result['error']}" if result.get("error") else f"{result['turns']} turn(s)"
+            print(f"[{finished}/{len(todo)}] {result['id']}: {status} in {result['elapsed_s']:.1f}s")
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.")
+        return 130
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)  # sessions already running still finish
+        writer.close()
+    print(f"Finished {len(todo)} prompt(s) in {time.perf_counter() - started:.1f}s, {failed} with errors. "
+          f"Results in {out_path}")
+    return 1 if failed else 0
@@ -0,0 +1,285 @@
+# benchmarks/bench_agent.py
+"""Drive the whole agent loop offline against a synthetic workspace.
+
+main.main runs with benchmarks.fake_gemini.FakeClient in place of
+genai.Client, so every turn is scripted and no API key or network is
+needed. Reports turns/s, tool calls/s, the tool-cache hit rate, peak
+Python memory per session and call_function throughput per tool.
+--error-rate makes the fake API fail that share of requests with
+429/5xx errors, to exercise the retry scheduler.
+
+Usage (from the project root):
+    python -m benchmarks.bench_agent [--files 200] [--sessions 5] [--stream]
+    python -m benchmarks.bench_agent --save benchmarks/baseline_agent.json
+    python -m benchmarks.bench_agent --check benchmarks/baseline_agent.json
+
+--check exits with status 1 when a metric is worse than the baseline by
+more than --tolerance, so it can gate a CI job.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List
+from unittest import mock
+
+import call_function as call_function_module
+import functions.backups as backups
+import main as agent
+from benchmarks.fake_gemini import FakeClient, call, text
+from functions.cache import ToolCache
+from functions.scheduler import ScheduledClient
+from functions.session_log import JsonlLogger
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline_agent.json")
+# larger is better for these; the rest (memory) must not grow
+THROUGHPUT = ("turns_per_s", "tool_calls_per_s", "cache_hit_rate")
+
+MODULE = '''"""Synthetic module {i}."""
+
+
+def helper_{i}(value):
+    return value + {i}
+
+
+class Widget{i}:
+    def __init__(self):
+        self.items = []
+
+    def add(self, item):
+        self.items.append(helper_{i}(item))
+        return len(self.items)
+'''
+
+TESTS = '''import unittest
+
+from pkg.mod_0 import helper_0, Widget0
+
+
+class SmokeTest(unittest.TestCase):
+    def test_helper(self):
+        self.assertEqual(helper_0(1), 1)
+
+    def test_widget(self):
+        self.assertEqual(Widget0().add(2), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
+'''
+
+
+def make_workspace(root: str, files: int, padding_lines: int) -> None:
+    """`files` modules under pkg/ (each padded to size), plus tests.py."""
+    pkg = os.path.join(root, "pkg")
+    os.makedirs(pkg, exist_ok=True)
+    open(os.path.join(pkg, "__init__.py"), "w").close()
+    padding = "".join(f"# filler line {n}\n" for n in range(padding_lines))
+    for i in range(files):
+        with open(os.path.join(pkg, f"mod_{i}.py"), "w") as f:
+            f.write(MODULE.format(i=i) + padding)
+    with open(os.path.join(root, "tests.py"), "w") as f:
+        f.write(TESTS)
+
+
+def session_script(files: int) -> List[List[Any]]:
+    """One session: explore, read, re-read (cache hits), edit, run the tests."""
+    picks = [f"pkg/mod_{i}.py" for i in sorted({0, files // 3, files // 2, files - 1})]
+    return [
+        [call("get_files_info", directory=".", recursive=True), call("search_code", query="def helper_")],
+        [call("get_file_content", file_path=p) for p in picks],
+        [call("get_file_content", file_path=p) for p in picks[:2]]
+        + [call("get_files_info", directory="pkg"),
+           call("apply_patch", file_path="pkg/mod_0.py",
+                edits=[{"search": "self.items = []", "replace": "self.items = []  # edited"}])],
+        [call("get_file_content", file_path="pkg/mod_0.py"), call("run_python_file", file_path="tests.py")],
+        [text("The tests pass.")],
+    ]
+
+
+def _tool_calls(script: List[List[Any]]) -> int:
+    return sum(1 for turn in script for part in turn if part.function_call)
+
+
+@contextlib.contextmanager
+def offline_agent(workspace: str, state_dir: str):
+    """Point the agent at `workspace` and keep its logs and backups in `state_dir`."""
+    os.environ.setdefault("GEMINI_API_KEY", "offline")
+    saved_log, saved_store = agent.conversation_log, backups._store
+    agent.conversation_log = JsonlLogger(os.path.join(state_dir, "conversation.jsonl"))
+    backups._store = backups.BackupStore(os.path.join(state_dir, "backups"))
+    try:
+        with mock.patch.object(call_function_module, "WORKING_DIRECTORY", workspace), \
+                mock.patch.object(agent, "WORKING_DIRECTORY", workspace):
+            yield
+    finally:
+        agent.conversation_log.close()
+        agent.conversation_log, backups._store = saved_log, saved_store
+
+
+def run_session(script: List[List[Any]], stream: bool, latency_s: float,
+                error_rate: float = 0.0, seed: int = 0) -> Dict[str, Any]:
+    """One fresh agent session through main.main; returns its counters."""
+    client = FakeClient(script, latency_s=latency_s, error_rate=error_rate, seed=seed)
+    scheduled: List[ScheduledClient] = []
+
+    def schedule(*args: Any, **kwargs: Any) -> ScheduledClient:
+        scheduled.append(ScheduledClient(*args, base_s=0.01, **kwargs))  # keep backoff short
+        return scheduled[-1]
+
+    agent.tool_cache = ToolCache()
+    argv = ["main.py", "--no-cache", "--until", "answer"] + (["--stream"] if stream else []) + ["benchmark"]
+    with mock.patch.object(agent, "create_api_client", lambda: client), \
+            mock.patch.object(agent, "ScheduledClient", schedule), \
+            mock.patch.object(sys, "argv", argv), contextlib.redirect_stdout(io.StringIO()):
+        agent.main()
+    return {"turns": len(client.requests), "tool_calls": _tool_calls(script), "cache": agent.tool_cache.stats(),
+            "api": scheduled[0].stats()}
+
+
+def bench_sessions(workspace: str, opts: argparse.Namespace) -> Dict[str, Any]:
+    script = session_script(opts.files)
+    edited = os.path.join(workspace, "pkg", "mod_0.py")
+    with open(edited, "rb") as f:
+        original = f.read()
+
+    sessions = iter(range(opts.sessions + 2))
+
+    def one(stream: bool) -> Dict[str, Any]:
+        try:
+            return run_session(script, stream, opts.latency, opts.error_rate, seed=next(sessions))
+        finally:
+            with open(edited, "wb") as f:  # undo the scripted edit for the next session
+                f.write(original)
+
+    one(opts.stream)  # warm-up: imports, search index, interpreter caches
+    durations, turns, tool_calls, hits, lookups, retries, backoff_s = [], 0, 0, 0, 0, 0, 0.0
+    for _ in range(opts.sessions):
+        started = time.perf_counter()
+        counts = one(opts.stream)
+        durations.append(time.perf_counter() - started)
+        turns += counts["turns"]
+        tool_calls += counts["tool_calls"]
+        hits += counts["cache"]["hits"]
+        lookups += counts["cache"]["hits"] + counts["cache"]["misses"]
+        retries += counts["api"]["retries"]
+        backoff_s += counts["api"]["backoff_s"]
+
+    tracemalloc.start()
+    one(opts.stream)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(durations)
+    return {
+        "sessions": opts.sessions,
+        "session_s_p50": round(statistics.median(durations), 4),
+        "turns_per_s": round(turns / total, 2),
+        "tool_calls_per_s": round(tool_calls / total, 2),
+        "cache_hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        "session_peak_kb": round(peak / 1024),
+        "api_retries": retries,
+        "api_backoff_s": round(backoff_s, 3),
+    }
+
+
+def bench_call_function(workspace: str, iterations: int) -> Dict[str, float]:
+    """Calls/s of call_function itself for the read-only tools."""
+    calls = {
+        "get_files_info": call("get_files_info", directory="pkg"),
+        "get_file_content": call("get_file_content", file_path="pkg/mod_1.py"),
+        "search_code": call("search_code", query="class Widget"),
+    }
+    rates = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, part in calls.items():
+            call_function_module.call_function(part.function_call)  # warm-up
+            started = time.perf_counter()
+            for _ in range(iterations):
+                call_function_module.call_function(part.function_call)
+            rates[name] = round(iterations / (time.perf_counter() - started), 1)
+    return rates
+
+
+def check(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics worse than `baseline` by more than `tolerance` (a fraction)."""
+    problems = []
+    now, then = results["agent"], baseline["agent"]
+    for key in THROUGHPUT:
+        if now[key] < then[key] * (1 - tolerance):
+            problems.append(f"{key}: {now[key]} < baseline {then[key]}")
+    if now["session_peak_kb"] > then["session_peak_kb"] * (1 + tolerance):
+        problems.append(f"session_peak_kb: {now['session_peak_kb']} > baseline {then['session_peak_kb']}")
+    for name, rate in results["call_function"].items():
+        old = baseline["call_function"].get(name)
+        if old and rate < old * (1 - tolerance):
+            problems.append(f"call_function {name}: {rate}/s < baseline {old}/s")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_agent")
+    parser.add_argument("--files", type=int, default=200, help="modules in the synthetic workspace")
+    parser.add_argument("--lines", type=int, default=50, help="padding lines per module")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=200, help="call_function calls per tool")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated model seconds per turn")
+    parser.add_argument("--stream", action="store_true", help="drive the --stream loop instead")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="share of model requests the fake API fails with 429/5xx")
+    parser.add_argument("--save", metavar="FILE", help="write the results as a baseline")
+    parser.add_argument("--check", metavar="FILE", nargs="?", const=DEFAULT_BASELINE,
+                        help="compare against a saved baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown (fraction)")
+    opts = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix="devdevbot-bench-")
+    try:
+        workspace = os.path.join(tmp, "workspace")
+        make_workspace(workspace, opts.files, opts.lines)
+        with offline_agent(workspace, os.path.join(tmp, "state")):
+            results = {
+                "config": {k: getattr(opts, k) for k in ("files", "lines", "sessions", "latency", "stream", "error_rate")},
+                "agent": bench_sessions(workspace, opts),
+                "call_function": bench_call_function(workspace, opts.iterations),
+            }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    a = results["agent"]
+    print(f"sessions {a['sessions']}  p50 {a['session_s_p50'] * 1e3:.1f} ms/session")
+    print(f"turns/s {a['turns_per_s']}  tool calls/s {a['tool_calls_per_s']}  "
+          f"cache hit rate {a['cache_hit_rate']:.0%}  peak {a['session_peak_kb']} KB/session")
+    if a["api_retries"]:
+        print(f"api retries {a['api_retries']}  backoff {a['api_backoff_s']:.2f}s")
+    for name, rate in results["call_function"].items():
+        print(f"call_function {name:<18}{rate:>10.1f} calls/s")
+
+    if opts.save:
+        with open(opts.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {opts.save}")
+    if opts.check:
+        with open(opts.check, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print(f"! baseline was recorded with {baseline.get('config')}; comparing anyway")
+        problems = check(results, baseline, opts.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            return 1
+        print(f"No regressions against {opts.check} (tolerance {opts.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# benchmarks/bench_calculator.py
+"""Compare the calculator's compiled, cached evaluator with the original
+split-and-shunting-yard path (Calculator._evaluate_infix).
+
+Cases: one expression evaluated over and over (cache hits), and a stream
+of distinct expressions (every one is tokenized and compiled).
+
+Usage (from the project root):
+    python -m benchmarks.bench_calculator [--iterations 20000]
+"""
+import argparse
+import sys
+import time
+
+sys.path.insert(0, "calculator")  # the app imports itself as `pkg`
+
+from pkg.calculator import COMPILE_CACHE_SIZE, Calculator, compile_expression  # noqa: E402
+
+REPEATED = "2 * 3 - 8 / 2 + 5 * 7 - 1 / 4"
+
+
+def _per_call_us(fn, expressions, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(expressions[i % len(expressions)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_calculator")
+    parser.add_argument("--iterations", type=int, default=20000)
+    opts = parser.parse_args()
+
+    calculator = Calculator()
+    # more distinct expressions than the cache holds, so each one misses
+    distinct = [f"{i} * 3 - {i % 97} / 2 + 5 * 7 - 1 / 4" for i in range(COMPILE_CACHE_SIZE * 4)]
+    cases = [("repeated", [REPEATED]), ("distinct", distinct)]
+    legacy = lambda e: calculator._evaluate_infix(e.split())  # noqa: E731
+
+    print(f"{'case':<10}{'infix us':>10}{'compiled us':>13}{'speedup':>9}")
+    for label, expressions in cases:
+        compile_expression.cache_clear()
+        old = _per_call_us(legacy, expressions, opts.iterations)
+        new = _per_call_us(calculator.evaluate, expressions, opts.iterations)
+        print(f"{label:<10}{old:>10.2f}{new:>13.2f}{old / new:>8.1f}x")
+    print(f"compile cache: {compile_expression.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
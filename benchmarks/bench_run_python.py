@@ -0,0 +1,53 @@
+# benchmarks/bench_run_python.py
+"""Compare cold `subprocess.run` starts with the warm forkserver pool.
+
+Usage (from the project root):
+    python -m benchmarks.bench_run_python [--runs 20]
+"""
+import argparse
+import statistics
+import time
+
+import functions.run_python as run_python
+from config import WORKING_DIRECTORY
+from functions.python_pool import warm_up
+
+CASES = [
+    ("main.py", ["3 + 5"]),
+    ("tests.py", []),
+]
+
+
+def _time_runs(file_path, args, runs):
+    samples = []
+    output = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = run_python.run_python_file(WORKING_DIRECTORY, file_path, args)
+        samples.append(time.perf_counter() - start)
+    return samples, output
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    opts = parser.parse_args()
+
+    warm_up()
+    print(f"{'case':<22}{'mode':<7}{'mean ms':>9}{'p50 ms':>9}{'min ms':>9}")
+    for file_path, args in CASES:
+        outputs = {}
+        for mode, pooled in (("cold", False), ("warm", True)):
+            run_python.PYTHON_POOL = pooled
+            samples, outputs[mode] = _time_runs(file_path, args, opts.runs)
+            label = " ".join([file_path] + args)
+            print(f"{label:<22}{mode:<7}{statistics.mean(samples) * 1e3:>9.1f}"
+                  f"{statistics.median(samples) * 1e3:>9.1f}{min(samples) * 1e3:>9.1f}")
+        cold, warm = (outputs[m].get("artifacts", {}) for m in ("cold", "warm"))
+        # stderr is left out: unittest prints its own timing there
+        if any(cold.get(k) != warm.get(k) for k in ("returncode", "stdout", "tests")):
+            print(f"  ! results differ for {file_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_startup.py
+"""Cold-start time of main.py, and what it imports on the way.
+
+Each case is a fresh interpreter, so this measures what a user waits for
+before the first line of output. `python -X importtime` lists the slowest
+imports; google.genai showing up there means something imports the SDK
+before a session needs it.
+
+Usage (from the project root):
+    python -m benchmarks.bench_startup [--runs 10] [--target-ms 300]
+
+Exits with status 1 when a case's median is over --target-ms or the SDK
+is imported at startup.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+CASES = [
+    ("usage", ["main.py"]),
+    ("connect (no server)", ["main.py", "--connect", "--socket", os.devnull + ".sock", "hello"]),
+    ("import main", ["-c", "import main"]),
+]
+HEAVY = ("google.genai", "dotenv", "asyncio")  # should load only once a session needs them
+
+
+def time_case(argv: List[str], runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def import_times() -> List[Tuple[int, str]]:
+    """(cumulative µs, module) for every import made by `import main`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (field.strip() for field in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=300.0,
+                        help="fail if a case's median wall time is above this")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    opts = parser.parse_args()
+
+    baseline = statistics.median(time_case(["-c", "pass"], opts.runs))
+    failed = False
+    print(f"{'case':<22}{'p50 ms':>9}{'min ms':>9}   (bare interpreter: {baseline * 1e3:.0f} ms)")
+    for label, argv in CASES:
+        samples = time_case(argv, opts.runs)
+        p50 = statistics.median(samples)
+        over = p50 * 1e3 > opts.target_ms
+        failed |= over
+        print(f"{label:<22}{p50 * 1e3:>9.1f}{min(samples) * 1e3:>9.1f}"
+              + (f"   over the {opts.target_ms:.0f} ms target" if over else ""))
+
+    rows = import_times()
+    top_level = [(us, name) for us, name in rows if not name.startswith(" ")]
+    print("\nslowest imports under `import main` (cumulative ms):")
+    for us, name in sorted(top_level, reverse=True)[:opts.top]:
+        print(f"  {us / 1e3:>8.1f}  {name}")
+    names = {name.strip() for _, name in rows}
+    heavy = sorted(n for n in names if any(n == h or n.startswith(h + ".") for h in HEAVY))
+    if heavy:
+        failed = True
+        print(f"\n! imported at startup: {', '.join(heavy[:5])}{' ...' if len(heavy) > 5 else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# benchmarks/fake_gemini.py
+"""A local stand-in for `genai.Client` that replays scripted responses.
+
+Each script entry is one model turn: a list of parts built with text() and
+call(). Once the script runs out the client answers "Done." so the agent
+loop ends on its own. Both the blocking API (generate_content) and the
+streaming one (--stream) are served from the same script.
+
+`errors` makes requests fail before they are served, the way a busy or
+flaky API does: either a list consumed one request at a time (None lets
+that request through) or, with `error_rate`, a seeded random choice.
+
+    client = FakeClient([[call("get_files_info")], [text("All good.")]])
+    client = FakeClient(turns, errors=[api_error(429, retry_after=1), None, api_error(503)])
+"""
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+from google.genai import errors, types
+
+Turn = Sequence[types.Part]
+
+
+def text(value: str) -> types.Part:
+    return types.Part(text=value)
+
+
+def call(name: str, **args: Any) -> types.Part:
+    return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+
+def api_error(code: int, retry_after: Optional[float] = None) -> errors.APIError:
+    """A ClientError/ServerError as the SDK raises it, optionally with a Retry-After header."""
+    headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+    body = {"error": {"code": code, "message": "injected by FakeClient", "status": "UNAVAILABLE"}}
+    cls = errors.ClientError if code < 500 else errors.ServerError
+    return cls(code, body, httpx.Response(code, headers=headers, json=body))
+
+
+def response(parts: Turn) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=100, candidates_token_count=10 * len(parts), total_token_count=100 + 10 * len(parts)),
+    )
+
+
+class _Script:
+    def __init__(self, turns: Sequence[Turn], latency_s: float, errors: Sequence[Optional[Exception]],
+                 error_rate: float, seed: int) -> None:
+        self.turns: List[Turn] = list(turns)
+        self.latency_s = latency_s
+        self.errors: List[Optional[Exception]] = list(errors)
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests: List[Dict[str, Any]] = []  # kwargs of every served request, in order
+        self.failed = 0
+
+    def next(self, kwargs: Dict[str, Any]) -> Turn:
+        error = self.errors.pop(0) if self.errors else None
+        if error is None and self.error_rate and self.rng.random() < self.error_rate:
+            error = api_error(self.rng.choice([429, 500, 503]), retry_after=self.rng.choice([None, 0.01]))
+        if error is not None:
+            self.failed += 1
+            raise error
+        self.requests.append(kwargs)
+        return self.turns.pop(0) if self.turns else [text("Done.")]
+
+
+class _Models:
+    def __init__(self, script: _Script) -> None:
+        self._script = script
+
+    def generate_content(self, **kwargs: Any) -> types.GenerateContentResponse:
+        turn = self._script.next(kwargs)
+        if self._script.latency_s:
+            time.sleep(self._script.latency_s)
+        return response(turn)
+
+
+class _AioModels:
+    def __init__(self, script: _Script) -> None:
+        self._script = script
+
+    async def generate_content_stream(self, **kwargs: Any):
+        turn = self._script.next(kwargs)
+        latency = self._script.latency_s / max(len(turn), 1)
+
+        async def chunks():
+            for part in turn:  # one part per chunk, as the live API tends to do
+                if latency:
+                    await asyncio.sleep(latency)
+                yield response([part])
+        return chunks()
+
+
+class _Aio:
+    def __init__(self, script: _Script) -> None:
+        self.models = _AioModels(script)
+
+
+class FakeClient:
+    """Serves `turns` in order; `latency_s` simulates model time per turn."""
+
+    def __init__(self, turns: Sequence[Turn] = (), latency_s: float = 0.0,
+                 errors: Sequence[Optional[Exception]] = (), error_rate: float = 0.0, seed: int = 0,
+                 **_: Any) -> None:
+        self.script = _Script(turns, latency_s, errors, error_rate, seed)
+        self.models = _Models(self.script)
+        self.aio = _Aio(self.script)
+
+    @property
+    def requests(self) -> List[Dict[str, Any]]:
+        return self.script.requests
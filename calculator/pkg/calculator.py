@@ -1,4 +1,83 @@
 # calculator.py
+import functools
+import re
+
+# a number (1, 2.5, .5, 1e3) or any other single non-space character
+_TOKEN = re.compile(r"((?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(\S)")
+_SYMBOLS = {"+", "-", "*", "/", "(", ")"}
+NEG = "neg"  # unary minus in compiled programs
+_PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2, NEG: 3}
+COMPILE_CACHE_SIZE = 256  # compiled expressions kept for reuse
+
+
+def tokenize(expression):
+    """Numbers as floats, operators and parentheses as strings, in one pass
+    over the expression. Spaces between tokens are optional and never change
+    the meaning: "3 -5", "3-5" and "3 - 5" are the same tokens."""
+    tokens = []
+    for number, symbol in _TOKEN.findall(expression):
+        if number:
+            tokens.append(float(number))
+        elif symbol in _SYMBOLS:
+            tokens.append(symbol)
+        else:
+            raise ValueError(f"invalid token: {symbol}")
+    return tokens
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(expression):
+    """Compile infix to a tuple in reverse Polish order: floats are pushed,
+    operators pop their operands. Operands and binary operators must
+    alternate, so a program that compiles always has the operands it needs
+    and running it never checks."""
+    program = []
+    pending = []
+    expect_operand = True
+    for token in tokenize(expression):
+        if token.__class__ is float:
+            if not expect_operand:
+                raise ValueError("invalid expression")
+            program.append(token)
+            expect_operand = False
+        elif token == "(":
+            if not expect_operand:
+                raise ValueError("invalid expression")
+            pending.append(token)
+        elif token == ")":
+            if expect_operand:
+                raise _missing_operand(pending)
+            while pending and pending[-1] != "(":
+                program.append(pending.pop())
+            if not pending:
+                raise ValueError("unbalanced parentheses")
+            pending.pop()
+        elif expect_operand:
+            if token != "-":
+                raise ValueError(f"not enough operands for operator {token}")
+            pending.append(NEG)
+        else:
+            precedence = _PRECEDENCE[token]
+            while pending and pending[-1] != "(" and _PRECEDENCE[pending[-1]] >= precedence:
+                program.append(pending.pop())
+            pending.append(token)
+            expect_operand = True
+
+    if expect_operand:
+        raise _missing_operand(pending)
+    if "(" in pending:
+        raise ValueError("unbalanced parentheses")
+    program.extend(reversed(pending))
+    return tuple(program)
+
+
+def _missing_operand(pending):
+    if pending and pending[-1] != "(":
+        operator = "-" if pending[-1] == NEG else pending[-1]
+        return ValueError(f"not enough operands for operator {operator}")
+    return ValueError("invalid expression")
+
+
 class Calculator:
     def __init__(self):
         self.operators = {
@@ -17,9 +96,25 @@ class Calculator:
     def evaluate(self, expression):
         if not expression or expression.isspace():
             return None
-        tokens = expression.strip().split()
-        return self._evaluate_infix(tokens)
+        return self._run(compile_expression(expression.strip()))
+
+    def _run(self, program):
+        values = []
+        push = values.append
+        pop = values.pop
+        operators = self.operators
+        for item in program:
+            if item.__class__ is float:
+                push(item)
+            elif item == NEG:
+                values[-1] = -values[-1]
+            else:
+                b = pop()
+                values[-1] = operators[item](values[-1], b)
+        return values[0]
 
+    # The original space-separated shunting-yard evaluator, kept as the
+    # reference the compiled path is benchmarked against.
     def _evaluate_infix(self, tokens):
         values = []
         operators = []
@@ -57,4 +152,4 @@ class Calculator:
 
         b = values.pop()
         a = values.pop()
-        values.append(self.operators[operator](a, b))
\ No newline at end of file
+        values.append(self.operators[operator](a, b))
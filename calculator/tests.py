@@ -1,7 +1,7 @@
 # tests.py
 
 import unittest
-from pkg.calculator import Calculator
+from pkg.calculator import Calculator, compile_expression
 
 
 class TestCalculator(unittest.TestCase):
@@ -44,6 +44,57 @@ class TestCalculator(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.calculator.evaluate("+ 3")
 
+    def test_without_spaces(self):
+        result = self.calculator.evaluate("2*3-8/2+5")
+        self.assertEqual(result, 7)
+
+    def test_spaces_do_not_change_meaning(self):
+        for expression in ("3 -5", "3-5", "3 - 5"):
+            self.assertEqual(self.calculator.evaluate(expression), -2)
+        self.assertEqual(self.calculator.evaluate("10 -2 * 3"), 4)
+
+    def test_same_errors_with_or_without_spaces(self):
+        for expression in ("3*+5", "3 * +5", "2*inf", "2 * inf", "1_000+1", "1_000 + 1"):
+            with self.assertRaises(ValueError):
+                self.calculator.evaluate(expression)
+
+    def test_parentheses(self):
+        result = self.calculator.evaluate("(2 + 3) * (4 - 1)")
+        self.assertEqual(result, 15)
+
+    def test_unary_minus(self):
+        self.assertEqual(self.calculator.evaluate("-3 + 5"), 2)
+        self.assertEqual(self.calculator.evaluate("2 * -(1 + 2)"), -6)
+        self.assertEqual(self.calculator.evaluate("4 - -1"), 5)
+
+    def test_decimals(self):
+        result = self.calculator.evaluate("1.5 * .5")
+        self.assertEqual(result, 0.75)
+
+    def test_unbalanced_parentheses(self):
+        for expression in ("(3 + 5", "3 + 5)", "()"):
+            with self.assertRaises(ValueError):
+                self.calculator.evaluate(expression)
+
+    def test_missing_operator(self):
+        with self.assertRaises(ValueError):
+            self.calculator.evaluate("3 5")
+
+    def test_trailing_operator(self):
+        with self.assertRaises(ValueError):
+            self.calculator.evaluate("3 +")
+
+    def test_compiled_expression_is_reused(self):
+        compile_expression.cache_clear()
+        self.calculator.evaluate("7 * (2 + 1)")
+        self.assertEqual(self.calculator.evaluate("7 * (2 + 1)"), 21)
+        self.assertEqual(compile_expression.cache_info().hits, 1)
+
+    def test_matches_reference_evaluator(self):
+        for expression in ("3 + 5", "2 * 3 - 8 / 2 + 5", "10 / 4 * 2 - 1"):
+            self.assertEqual(self.calculator.evaluate(expression),
+                             self.calculator._evaluate_infix(expression.split()))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,46 @@
 # config.py
-MAX_CHARS = 10000
+MAX_CHARS = 10000  # per get_file_content call; larger files are paged
+MMAP_THRESHOLD = 1024 * 1024  # files at least this big are memory-mapped for ranged reads
+BINARY_SNIFF_BYTES = 8192
+LIST_PAGE_SIZE = 500  # max entries per get_files_info call
+SEARCH_MAX_RESULTS = 100  # max matches per search_code call
+SEARCH_MAX_FILE_BYTES = 1024 * 1024  # larger files are left out of the search index
 MAX_ITERATIONS = 15
 WORKING_DIRECTORY = "./calculator"
 GEMINI_MODEL = "gemini-2.0-flash-001"
-LOG_PATH = "conversation.log"
\ No newline at end of file
+LOG_PATH = "conversation.jsonl"  # one JSON event per line; see functions/session_log.py
+LOG_MAX_BYTES = 5 * 1024 * 1024  # rotate to LOG_PATH.1 ... past this size
+LOG_BACKUPS = 5
+TOOL_WORKERS = 4  # parallel tool calls per turn; 1 runs them one at a time
+TOOL_CACHE_MAX_BYTES = 8 * 1024 * 1024  # approximate budget for cached read/list results
+TOOL_CACHE_DIR = ".devdevbot/cache"  # persistent tool cache shared across runs
+REPLAY_DIR = ".devdevbot/replay"  # model responses saved by --record, served by --replay
+API_RPM = None  # e.g. 15: model requests per minute across all sessions in this process
+API_TPM = None  # e.g. 1_000_000: estimated tokens per minute, settled against reported usage
+API_MAX_RETRIES = 5  # per request, for 429/5xx and connection errors
+API_BACKOFF_BASE_S = 1.0  # first retry waits up to this long, doubling each time...
+API_BACKOFF_MAX_S = 60.0  # ...up to this; a server retry hint takes precedence
+SESSION_DEADLINE_S = None  # e.g. 600: no request (or retry) is started after this long
+SERVER_SOCKET = ".devdevbot/agent.sock"  # Unix socket for --serve / --connect
+SERVER_MAX_SESSIONS = 8  # sessions a --serve process runs at once; more wait their turn
+BATCH_CONCURRENCY = 4  # sessions --batch runs at once
+DISK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DISK_CACHE_MAX_AGE_S = 7 * 24 * 3600
+DISK_CACHE_HASH_MAX_BYTES = 1024 * 1024  # larger files are revalidated by stat alone, never hashed
+STOP_REPORT_LINES = 10  # output lines shown when a tool result ends the session
+CONTEXT_MAX_CHARS = 60000  # request budget (~15k tokens) before old tool payloads are stubbed
+PYTHON_POOL = False  # run scripts in children forked from a warm interpreter (Linux/macOS)
+PYTHON_POOL_SIZE = 2  # warm workers; each runs one script at a time
+PYTHON_POOL_PRELOAD = ["unittest", "json", "re", "collections", "typing", "argparse"]
+RUN_CACHE = False  # reuse run_python_file results while the workspace is unchanged
+RUN_CACHE_MAX_ENTRIES = 64
+RUN_TIMEOUT_S = 10  # run_python_file kills scripts that run longer
+RUN_CAPTURE_HEAD_BYTES = 8192  # per stream: run_python_file keeps this much from the start...
+RUN_CAPTURE_TAIL_BYTES = 8192  # ...and this much from the end, dropping the middle
+RUN_OUTPUT_LOG_DIR = None  # e.g. ".devdevbot/runs" to tee the full output of every run to disk
+RUN_LIMIT_AS_BYTES = None  # e.g. 1024 * 1024 * 1024 caps each script's address space (RLIMIT_AS)
+RUN_LIMIT_CPU_S = None  # CPU seconds before SIGXCPU (RLIMIT_CPU); the wall clock is RUN_TIMEOUT_S
+RUN_LIMIT_FSIZE_BYTES = None  # largest file a script may write (RLIMIT_FSIZE)
+BACKUP_DIR = ".devdevbot/backups"  # content-addressed copies of overwritten files
+BACKUP_KEEP_VERSIONS = 20  # per file
+BACKUP_MAX_BYTES = 256 * 1024 * 1024
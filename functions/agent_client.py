@@ -0,0 +1,41 @@
+# functions/agent_client.py
+"""Thin client for a `python main.py --serve` process (see server.py).
+
+Only the standard library is needed here, so --connect does not pay for
+importing the SDK and tools on every prompt.
+"""
+import json
+import socket
+import sys
+from typing import Any
+
+
+def connect(options: Any) -> int:
+    """Thin client: send the prompt and print the session's output as it arrives."""
+    if not options.prompt:
+        print('Usage: python main.py --connect "your prompt here"')
+        return 1
+    request = {"prompt": " ".join(options.prompt), "stream": options.stream, "verbose": options.verbose}
+    # only what was given on the command line; the server's own settings fill the rest
+    for name in ("until", "max_iterations", "tool_workers"):
+        if getattr(options, name) is not None:
+            request[name] = getattr(options, name)
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(options.socket)
+        except OSError:
+            print(f"No agent server on {options.socket}; start one with: python main.py --serve")
+            return 1
+        sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        for line in sock.makefile("r", encoding="utf-8"):
+            message = json.loads(line)
+            if "output" in message:
+                sys.stdout.write(message["output"])
+                sys.stdout.flush()
+            elif "error" in message:
+                print(f"Error: {message['error']}")
+                return 1
+            elif "result" in message:
+                return 0
+    print("Error: the server closed the connection")
+    return 1
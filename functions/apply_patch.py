@@ -0,0 +1,194 @@
+# functions/apply_patch.py
+import functools
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from functions.write_file_content import commit_write
+from functions.registry import WRITE, tool
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchError(ValueError):
+    pass
+
+
+def _lines(text: str) -> List[str]:
+    """Split on line feeds only, unlike str.splitlines, which also breaks
+    on form feeds and Unicode separators. The empty piece after a final
+    newline is dropped."""
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def parse_unified_diff(patch: str) -> List[Tuple[int, List[str], List[str], int, int, List[Optional[int]]]]:
+    """(old start line, old lines, new lines, removed, added, kept) per hunk of a one-file diff.
+
+    kept[i] is the index in the old lines of new line i when it is context,
+    None when it is added. File headers (---/+++/diff/index) are ignored;
+    the target is file_path. A blank line inside a hunk counts as an empty
+    context line, since models often drop the leading space.
+    """
+    hunks = []
+    current = None
+    for line in _lines(patch):
+        if line.endswith("\r"):
+            line = line[:-1]
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = [int(header.group(1)), [], [], 0, 0, []]
+            hunks.append(current)
+            continue
+        if current is None or line.startswith("\\"):
+            continue  # preamble, or "\ No newline at end of file"
+        tag, text = (line[:1], line[1:]) if line else (" ", "")
+        if tag == " ":
+            current[5].append(len(current[1]))
+            current[1].append(text)
+            current[2].append(text)
+        elif tag == "-":
+            current[1].append(text)
+            current[3] += 1
+        elif tag == "+":
+            current[2].append(text)
+            current[4] += 1
+            current[5].append(None)
+        else:
+            raise PatchError(f"unexpected line in hunk: {line[:60]!r}")
+    if not hunks:
+        raise PatchError("no @@ hunks found in patch")
+    return [tuple(h) for h in hunks]
+
+
+def _find_block(lines: List[str], block: List[str], near: int) -> Optional[int]:
+    """Index where `block` occurs in `lines`, preferring the one closest to `near`."""
+    if not block:
+        return min(max(near, 0), len(lines))
+    for same in (lambda a, b: a == b, lambda a, b: a.rstrip() == b.rstrip()):
+        last = len(lines) - len(block)
+        for distance in range(max(near, last - near) + 1):
+            for start in (near - distance, near + distance):
+                if 0 <= start <= last and all(same(lines[start + i], b) for i, b in enumerate(block)):
+                    return start
+    return None
+
+
+def apply_unified_diff(text: str, patch: str) -> Tuple[str, Dict[str, int]]:
+    """Each line keeps its own ending (LF or CRLF); added lines get the
+    ending most of the file uses."""
+    lines, endings = [], []
+    for line in _lines(text):
+        crlf = line.endswith("\r")
+        lines.append(line[:-1] if crlf else line)
+        endings.append("\r\n" if crlf else "\n")
+    newline = "\r\n" if endings.count("\r\n") * 2 > len(endings) else "\n"
+    trailing = text.endswith("\n") or not text
+    hunks = parse_unified_diff(patch)
+    delta = 0
+    for n, (old_start, old, new, _, _, kept) in enumerate(hunks, 1):
+        # a hunk with no old lines inserts after line old_start (0 = at the top)
+        near = max(old_start - 1, 0) + delta if old else old_start + delta
+        at = _find_block(lines, old, near)
+        if at is None:
+            raise PatchError(f"hunk {n} (@@ -{old_start}) does not match the file; re-read it and retry")
+        old_endings = endings[at:at + len(old)]
+        lines[at:at + len(old)] = new
+        endings[at:at + len(old)] = [newline if k is None else old_endings[k] for k in kept]
+        delta += len(new) - len(old)
+    result = "".join(line + ending for line, ending in zip(lines, endings))
+    if lines and not trailing:
+        result = result[:-len(endings[-1])]
+    return result, {"hunks": len(hunks), "added": sum(h[4] for h in hunks),
+                    "removed": sum(h[3] for h in hunks)}
+
+
+def apply_edits(text: str, edits: List[Dict[str, Any]]) -> Tuple[str, Dict[str, int]]:
+    added = removed = 0
+    for n, edit in enumerate(edits, 1):
+        search = str(edit.get("search") or "")
+        replace = str(edit.get("replace") or "")
+        if not search:
+            raise PatchError(f"edit {n}: search text must not be empty")
+        if search not in text and "\r\n" in text:
+            search, replace = search.replace("\n", "\r\n"), replace.replace("\n", "\r\n")
+        count = text.count(search)
+        if count == 0:
+            raise PatchError(f"edit {n}: search text not found; re-read the file and retry")
+        if count > 1:
+            raise PatchError(f"edit {n}: search text occurs {count} times; include more context")
+        text = text.replace(search, replace, 1)
+        removed += len(search.splitlines())
+        added += len(replace.splitlines())
+    return text, {"hunks": len(edits), "added": added, "removed": removed}
+
+
+@tool(WRITE, schema=lambda: schema_apply_patch())
+def apply_patch(working_directory: str, file_path: str, patch: str = None, edits: List[Dict[str, Any]] = None):
+    sandbox = Path(working_directory).resolve()
+    full_path = (sandbox / file_path).resolve()
+    try:
+        full_path.relative_to(sandbox)
+    except ValueError:
+        return {"status": "error", "kind": "write", "details": f'Cannot write outside working dir: "{file_path}"'}
+    if bool(patch) == bool(edits):
+        return {"status": "error", "kind": "write", "details": "pass exactly one of patch or edits"}
+
+    if full_path.is_file():
+        try:
+            text = full_path.read_bytes().decode("utf-8")
+        except UnicodeDecodeError:
+            return {"status": "error", "kind": "write", "details": f'"{file_path}" is not UTF-8 text'}
+    elif patch and not full_path.exists():
+        text = ""  # a diff against /dev/null creates the file
+    else:
+        return {"status": "error", "kind": "write", "details": f'File "{file_path}" not found.'}
+
+    try:
+        new_text, stats = apply_unified_diff(text, patch) if patch else apply_edits(text, edits)
+    except PatchError as e:
+        return {"status": "error", "kind": "write", "details": str(e)}
+
+    details = f'patched "{file_path}": {stats["hunks"]} hunk(s), +{stats["added"]} -{stats["removed"]} lines'
+    return commit_write(full_path, file_path, new_text.encode("utf-8"), details, stats)
+
+
+@functools.cache
+def schema_apply_patch():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="apply_patch",
+        description=(
+            "Edit an existing file without resending it: either a unified diff (@@ hunks with a few lines "
+            "of context) or a list of search/replace edits. Each search text must occur exactly once. "
+            "Returns only a short summary. Prefer this over write_file for changes to existing files."
+        ),
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_path": types.Schema(
+                    type=types.Type.STRING,
+                    description="Path to the file to edit, relative to the working directory.",
+                ),
+                "patch": types.Schema(
+                    type=types.Type.STRING,
+                    description="Unified diff for this one file, e.g. '@@ -3,2 +3,2 @@\\n context\\n-old\\n+new'.",
+                ),
+                "edits": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(
+                        type=types.Type.OBJECT,
+                        properties={
+                            "search": types.Schema(type=types.Type.STRING, description="Exact text to find."),
+                            "replace": types.Schema(type=types.Type.STRING, description="Text to put in its place."),
+                        },
+                        required=["search", "replace"],
+                    ),
+                    description="Search/replace edits, applied in order. Use instead of patch.",
+                ),
+            },
+            required=["file_path"],
+        ),
+    )
@@ -0,0 +1,194 @@
+# functions/backups.py
+"""Content-addressed backups of files overwritten by write_file/apply_patch.
+
+Each version is stored once under blobs/<sha[:2]>/<sha>, however many
+files or writes share it. Every file has its own append-only manifest
+(manifests/<hash of its path>.jsonl), so recording a backup costs one
+append, not a probe for a free .bak.N name. The store lives outside the
+working directory and never shows up in listings or searches.
+
+    python -m functions.backups list calculator/pkg/calculator.py
+    python -m functions.backups restore calculator/pkg/calculator.py [--version N]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from config import BACKUP_DIR, BACKUP_KEEP_VERSIONS, BACKUP_MAX_BYTES
+from functions.utils import atomic_write
+
+GC_EVERY = 64  # backups between retention sweeps
+
+
+class BackupStore:
+    def __init__(self, root: str = BACKUP_DIR, keep: int = BACKUP_KEEP_VERSIONS,
+                 max_bytes: int = BACKUP_MAX_BYTES) -> None:
+        self.root = root
+        self.keep = keep
+        self.max_bytes = max_bytes
+        self.blobs = os.path.join(root, "blobs")
+        self.manifests = os.path.join(root, "manifests")
+        os.makedirs(self.blobs, exist_ok=True)
+        os.makedirs(self.manifests, exist_ok=True)
+        self._lock = threading.Lock()  # gc must not drop a blob mid-save
+        self._saves = 0
+
+    def _blob(self, digest: str) -> str:
+        return os.path.join(self.blobs, digest[:2], digest)
+
+    def _manifest(self, path: str) -> str:
+        key = hashlib.sha256(os.path.realpath(path).encode("utf-8", "surrogateescape")).hexdigest()
+        return os.path.join(self.manifests, key[:32] + ".jsonl")
+
+    def save(self, path: str) -> Optional[Dict[str, Any]]:
+        """Record the current content of `path`; None if it does not exist."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        digest = hashlib.sha256(data).hexdigest()
+        entry = {"path": os.path.realpath(path), "sha256": digest, "size": len(data), "time": time.time()}
+        with self._lock:
+            blob = self._blob(digest)
+            if not os.path.exists(blob):
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                atomic_write(blob, data)
+            with open(self._manifest(path), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._saves += 1
+            if self._saves % GC_EVERY == 0:
+                self._gc()
+        return entry
+
+    def versions(self, path: str) -> List[Dict[str, Any]]:
+        """Backups of `path`, oldest first."""
+        return _read_manifest(self._manifest(path))
+
+    def restore(self, path: str, version: int = -1) -> Dict[str, Any]:
+        """Put backup `version` (an index into versions()) back in place.
+
+        The current content is backed up first, so a restore can be undone.
+        """
+        entry = self.versions(path)[version]
+        with open(self._blob(entry["sha256"]), "rb") as f:
+            data = f.read()
+        self.save(path)
+        os.makedirs(os.path.dirname(os.path.realpath(path)), exist_ok=True)
+        atomic_write(path, data)
+        return entry
+
+    def gc(self) -> int:
+        with self._lock:
+            return self._gc()
+
+    def _gc(self) -> int:
+        """Keep the newest `keep` versions per file and at most `max_bytes`
+        of blobs overall; returns the number of blobs removed."""
+        manifests = {}
+        for name in os.listdir(self.manifests):
+            full = os.path.join(self.manifests, name)
+            entries = _read_manifest(full)
+            if len(entries) > self.keep:
+                entries = entries[-self.keep:]
+                _write_manifest(full, entries)
+            manifests[full] = entries
+
+        sizes = {e["sha256"]: e["size"] for entries in manifests.values() for e in entries}
+        total = sum(sizes.values())
+        if total > self.max_bytes:
+            # drop the oldest versions across all files until under budget
+            refs = Counter(e["sha256"] for entries in manifests.values() for e in entries)
+            everything = [(e, full) for full, entries in manifests.items() for e in entries]
+            for e, full in sorted(everything, key=lambda item: item[0]["time"]):
+                if total <= self.max_bytes:
+                    break
+                manifests[full].remove(e)
+                refs[e["sha256"]] -= 1
+                if not refs[e["sha256"]]:
+                    total -= sizes.pop(e["sha256"])
+            for full, entries in manifests.items():
+                _write_manifest(full, entries)
+
+        removed = 0
+        for prefix in os.listdir(self.blobs):
+            for digest in os.listdir(os.path.join(self.blobs, prefix)):
+                if digest not in sizes:
+                    os.remove(os.path.join(self.blobs, prefix, digest))
+                    removed += 1
+        return removed
+
+
+def _read_manifest(full: str) -> List[Dict[str, Any]]:
+    entries = []
+    try:
+        with open(full, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # torn final line from a crash
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _write_manifest(full: str, entries: List[Dict[str, Any]]) -> None:
+    if not entries:
+        os.remove(full)
+        return
+    atomic_write(full, "".join(json.dumps(e) + "\n" for e in entries).encode("utf-8"))
+
+
+_store: Optional[BackupStore] = None
+_store_lock = threading.Lock()
+
+
+def get_backup_store() -> BackupStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BackupStore()
+    return _store
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m functions.backups")
+    parser.add_argument("command", choices=["list", "restore", "gc"])
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--version", type=int, default=-1,
+                        help="index from 'list' (default: the newest backup)")
+    opts = parser.parse_args(argv)
+    store = get_backup_store()
+
+    if opts.command == "gc":
+        print(f"removed {store.gc()} blob(s)")
+        return 0
+    if not opts.path:
+        parser.error(f"{opts.command} needs a path")
+    versions = store.versions(opts.path)
+    if not versions:
+        print(f"no backups of {opts.path}")
+        return 1
+    if opts.command == "list":
+        for i, e in enumerate(versions):
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(e["time"]))
+            print(f"{i:>4}  {stamp}  {e['size']:>9} B  {e['sha256'][:12]}")
+        return 0
+    try:
+        entry = store.restore(opts.path, opts.version)
+    except IndexError:
+        print(f"no backup {opts.version}; see 'list'")
+        return 1
+    print(f"restored {opts.path} to {entry['sha256'][:12]} ({entry['size']} B)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
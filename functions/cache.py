@@ -1,6 +1,12 @@
 # functions/cache.py
 import json
-from typing import Any, Dict, Tuple, TypedDict
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple, TypedDict
+
+from config import TOOL_CACHE_MAX_BYTES
+from functions.profiler import profiler
 
 class Payload(TypedDict, total=False):
     status: str
@@ -8,6 +14,7 @@ class Payload(TypedDict, total=False):
     details: str
     artifacts: Dict[str, Any]
 
+@profiler.timed("cache.key")
 def make_key(name: str, args: Dict[str, Any]) -> str:
     try:
         args_str = json.dumps(args, sort_keys=True, separators=(',', ':'))
@@ -17,16 +24,170 @@ def make_key(name: str, args: Dict[str, Any]) -> str:
         args_str = json.dumps(safe_args, sort_keys=True, separators=(',', ':'))
     return f"{name}|{args_str}"
 
+def target_path(name: str, args: Dict[str, Any]) -> Optional[str]:
+    """Absolute path a cached result depends on, or None if not path based."""
+    base = os.path.realpath(args.get("working_directory", "."))
+    if name == "get_file_content":
+        rel = args.get("file_path")
+    elif name == "get_files_info":
+        rel = args.get("directory", ".")
+    else:
+        return None
+    if rel is None:
+        return None
+    return os.path.realpath(os.path.join(base, rel))
+
+def stat_signature(name: str, path: str, args: Optional[Dict[str, Any]] = None) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if name == "get_files_info":
+        # a directory's mtime moves whenever an entry is added, removed or renamed
+        if args and args.get("recursive"):
+            return _tree_signature(path, args.get("max_depth"))
+        return (st.st_ino, st.st_mtime_ns)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _tree_signature(path: str, max_depth: Any) -> tuple:
+    # inode + mtime of every directory a recursive listing would visit
+    depth_limit = None if max_depth is None else int(max_depth)
+    sig = []
+    stack = [(path, 1)]
+    while stack:
+        current, depth = stack.pop()
+        try:
+            st = os.stat(current)
+            sig.append((current, st.st_ino, st.st_mtime_ns))
+            if depth_limit is not None and depth >= depth_limit:
+                continue
+            with os.scandir(current) as it:
+                stack.extend((e.path, depth + 1) for e in it
+                             if e.is_dir(follow_symlinks=False) and e.name != ".git")
+        except OSError:
+            continue
+    return tuple(sorted(sig))
+
+class _Entry(NamedTuple):
+    part: Any           # cached function_response Part
+    payload: Dict       # cached response payload dict
+    path: str
+    args: Dict[str, Any]
+    signature: tuple
+    size: int           # approximate bytes held by this entry
+
 class ToolCache:
-    def __init__(self) -> None:
-        self._parts: Dict[str, Any] = {}      # cached function_response Part
-        self._payloads: Dict[str, Dict] = {}  # cached response payload dict
+    """LRU cache of read/list tool results, bounded by an approximate byte budget.
+
+    Every hit is checked against the current stat signature of the file or
+    directory it came from, so edits made on disk are never served stale.
+    An optional `store` (see functions/disk_cache.py) backs the memory tier
+    so results survive across runs.
+    """
+
+    def __init__(self, max_bytes: int = TOOL_CACHE_MAX_BYTES, store: Any = None) -> None:
+        self.max_bytes = max_bytes
+        self.store = store
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+        self.invalidations = 0
+        self.disk_hits = 0
 
+    @profiler.timed("cache.get")
     def get(self, name: str, args: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
         key = make_key(name, args)
-        return self._parts.get(key, None), self._payloads.get(key, {})
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return self._get_from_store(name, args)
 
+        # stat outside the lock so slow filesystems don't serialise lookups
+        fresh = stat_signature(name, entry.path, entry.args) == entry.signature
+
+        with self._lock:
+            if fresh:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.part, entry.payload
+            if self._entries.get(key) is entry:
+                self._drop(key)
+            self.stale += 1
+        return self._get_from_store(name, args)
+
+    def _get_from_store(self, name: str, args: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        payload = self.store.get(name, args) if self.store is not None else None
+        if payload is None:
+            with self._lock:
+                self.misses += 1
+            return None, {}
+        from google.genai import types
+        part = types.Part.from_function_response(name=name, response=payload)
+        self._remember(name, args, part, payload)
+        with self._lock:
+            self.hits += 1
+            self.disk_hits += 1
+        return part, payload
+
+    @profiler.timed("cache.set")
     def set(self, name: str, args: Dict[str, Any], resp_part: Any, payload: Dict) -> None:
+        if self._remember(name, args, resp_part, payload) and self.store is not None:
+            self.store.set(name, args, payload)
+
+    def _remember(self, name: str, args: Dict[str, Any], resp_part: Any, payload: Dict) -> bool:
+        path = target_path(name, args)
+        if path is None or payload.get("status") != "ok":
+            return False
+        signature = stat_signature(name, path, args)
+        if signature is None:
+            return False
+        size = len(json.dumps(payload, default=str))
+        if size > self.max_bytes:
+            return False
+
         key = make_key(name, args)
-        self._parts[key] = resp_part
-        self._payloads[key] = payload
\ No newline at end of file
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(resp_part, payload, path, args, signature, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def invalidate(self, working_directory: str, file_path: str) -> int:
+        """Drop entries for `file_path` and for every directory listing above it."""
+        target = os.path.realpath(os.path.join(os.path.realpath(working_directory), file_path))
+        with self._lock:
+            doomed = [key for key, entry in self._entries.items()
+                      if entry.path == target or target.startswith(entry.path + os.sep)]
+            for key in doomed:
+                self._drop(key)
+            self.invalidations += len(doomed)
+        if self.store is not None:
+            self.store.invalidate(target)
+        return len(doomed)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries, used = len(self._entries), self._bytes
+        return {
+            "entries": entries,
+            "bytes": used,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "stale": self.stale,
+            "invalidations": self.invalidations,
+            "disk_hits": self.disk_hits,
+        }
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
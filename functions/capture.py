@@ -0,0 +1,76 @@
+# functions/capture.py
+import os
+import selectors
+import time
+from typing import BinaryIO, Dict, Optional
+
+from config import RUN_CAPTURE_HEAD_BYTES, RUN_CAPTURE_TAIL_BYTES
+
+
+class BoundedCapture:
+    """Keeps the first `head_bytes` and last `tail_bytes` of a stream.
+
+    Everything in between is counted and dropped, so a script that prints in
+    a loop costs a fixed amount of memory. The full stream can optionally be
+    teed to a file as it arrives.
+    """
+
+    def __init__(self, head_bytes: int = RUN_CAPTURE_HEAD_BYTES,
+                 tail_bytes: int = RUN_CAPTURE_TAIL_BYTES, tee: Optional[BinaryIO] = None) -> None:
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.tee = tee
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        if self.tee is not None:
+            self.tee.write(data)
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data and self.tail_bytes:
+            self.tail += data
+            overflow = len(self.tail) - self.tail_bytes
+            if overflow > 0:
+                del self.tail[:overflow]
+
+    @property
+    def dropped(self) -> int:
+        return self.total - len(self.head) - len(self.tail)
+
+    def text(self) -> str:
+        head = self.head.decode("utf-8", errors="replace")
+        if not self.dropped:
+            return head + self.tail.decode("utf-8", errors="replace")
+        return (head + f"\n[... {self.dropped} bytes dropped ...]\n"
+                + self.tail.decode("utf-8", errors="replace"))
+
+
+def drain(captures: Dict[int, BoundedCapture], deadline: Optional[float] = None) -> bool:
+    """Read every fd in `captures` to EOF, feeding its capture as data arrives.
+
+    Returns False if `deadline` (a time.monotonic() value) passed first; the
+    fds are then left open for the caller to finish once the writer is dead.
+    """
+    with selectors.DefaultSelector() as sel:
+        for fd in captures:
+            sel.register(fd, selectors.EVENT_READ)
+        remaining = len(captures)
+        while remaining:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    return False
+            for key, _ in sel.select(timeout):
+                data = os.read(key.fd, 65536)
+                if data:
+                    captures[key.fd].write(data)
+                else:
+                    sel.unregister(key.fd)
+                    remaining -= 1
+    return True
@@ -0,0 +1,140 @@
+# functions/context.py
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import CONTEXT_MAX_CHARS
+
+STUB_DETAIL_CHARS = 200  # how much of a run's output survives in its stub
+
+
+def part_chars(part: Any) -> int:
+    """Approximate request size of one part (roughly 4 chars per token)."""
+    if getattr(part, "text", None):
+        return len(part.text)
+    fc = getattr(part, "function_call", None)
+    if fc is not None:
+        return len(fc.name or "") + len(json.dumps(fc.args or {}, default=str))
+    fr = getattr(part, "function_response", None)
+    if fr is not None:
+        return len(fr.name or "") + len(json.dumps(fr.response or {}, default=str))
+    return 0
+
+
+def request_chars(messages: List[Any]) -> int:
+    return sum(part_chars(p) for m in messages for p in (m.parts or []))
+
+
+def _read_identity(payload: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    if payload.get("kind") != "read" or payload.get("status") != "ok":
+        return None
+    art = payload.get("artifacts") or {}
+    content = art.get("content")
+    if not isinstance(content, str):
+        return None
+    digest = hashlib.sha256(content.encode("utf-8", "replace")).hexdigest()[:12]
+    return art.get("file_path", "?"), digest
+
+
+def _kb(n: int) -> str:
+    return f"{n / 1024:.1f} KB"
+
+
+def stub_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Short stand-in for a payload the model has already acted on."""
+    status, kind = payload.get("status"), payload.get("kind")
+    art = payload.get("artifacts") or {}
+    ident = _read_identity(payload)
+    if ident is not None:
+        path, digest = ident
+        note = (f"file {path}, {_kb(len(art['content']))}, sha {digest}, "
+                "already read; read it again if you need the content")
+    elif kind == "list" and status == "ok":
+        note = f"listing of {art.get('directory', '.')}, {len(art.get('entries') or [])} entries, already seen"
+    elif kind == "run" and art:
+        output = (art.get("stderr") or art.get("stdout") or "").strip()
+        note = f"{art.get('file_path')}: {payload.get('details')}; output already seen"
+        if output:
+            note += f", ending: ...{output[-STUB_DETAIL_CHARS:]}"
+    else:
+        detail = str(payload.get("details") or json.dumps(art, default=str))
+        if len(detail) <= STUB_DETAIL_CHARS:
+            return payload
+        note = detail[:STUB_DETAIL_CHARS] + f"... [{len(detail) - STUB_DETAIL_CHARS} chars compacted]"
+    return {"status": status, "kind": kind, "details": note, "compacted": True}
+
+
+def compact_messages(messages: List[Any], budget: int = CONTEXT_MAX_CHARS) -> List[Any]:
+    """Return the history to send for the next request.
+
+    `messages` itself is never modified. Repeated identical reads of a file
+    are replaced with a reference to the first one, and while the request
+    is still over `budget` chars, tool payloads the model has already
+    answered are collapsed into stubs, oldest first. The newest tool message
+    (the one the model has not seen yet) is always sent in full.
+    """
+    # a tool message has been acted on once an assistant message follows it
+    last_assistant = max((i for i, m in enumerate(messages) if m.role in ("assistant", "model")),
+                         default=-1)
+
+    # replacement payloads, keyed by (message index, part index)
+    replaced: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    first_seen: Dict[Tuple[str, str], Tuple[int, int]] = {}
+    newest_use: Dict[Tuple[int, int], int] = {}
+    for i, msg in enumerate(messages):
+        if msg.role != "tool":
+            continue
+        for j, part in enumerate(msg.parts or []):
+            fr = getattr(part, "function_response", None)
+            ident = _read_identity(fr.response or {}) if fr is not None else None
+            if ident is None:
+                continue
+            if ident in first_seen:
+                origin = first_seen[ident]
+                newest_use[origin] = i
+                replaced[(i, j)] = {
+                    "status": "ok", "kind": "read", "compacted": True,
+                    "details": f"file {ident[0]} unchanged (sha {ident[1]}), identical to "
+                               f"the earlier read in message {origin[0]}",
+                }
+            else:
+                first_seen[ident] = (i, j)
+                newest_use[(i, j)] = i
+
+    size = request_chars(messages)
+    for (i, j), stub in replaced.items():
+        size += len(json.dumps(stub)) - part_chars(messages[i].parts[j])
+
+    if budget and size > budget:
+        for i, msg in enumerate(messages):
+            if size <= budget:
+                break
+            if msg.role != "tool" or i > last_assistant:
+                continue
+            for j, part in enumerate(msg.parts or []):
+                fr = getattr(part, "function_response", None)
+                # keep originals that a not-yet-answered duplicate still points at
+                if fr is None or (i, j) in replaced or newest_use.get((i, j), i) > last_assistant:
+                    continue
+                stub = stub_payload(fr.response or {})
+                if stub is fr.response:
+                    continue
+                replaced[(i, j)] = stub
+                size += len(json.dumps(stub)) - part_chars(part)
+
+    if not replaced:
+        return list(messages)
+
+    from google.genai import types
+    compacted = []
+    for i, msg in enumerate(messages):
+        touched = [j for j in range(len(msg.parts or [])) if (i, j) in replaced]
+        if not touched:
+            compacted.append(msg)
+            continue
+        parts = list(msg.parts)
+        for j in touched:
+            parts[j] = types.Part.from_function_response(
+                name=parts[j].function_response.name, response=replaced[(i, j)])
+        compacted.append(types.Content(role=msg.role, parts=parts))
+    return compacted
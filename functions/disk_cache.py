@@ -0,0 +1,149 @@
+# functions/disk_cache.py
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import DISK_CACHE_HASH_MAX_BYTES, DISK_CACHE_MAX_AGE_S, DISK_CACHE_MAX_BYTES
+from functions.cache import make_key, stat_signature, target_path
+from functions.profiler import profiler
+from functions.utils import file_digest
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key          TEXT PRIMARY KEY,
+    name         TEXT NOT NULL,
+    path         TEXT NOT NULL,
+    signature    TEXT NOT NULL,
+    content_hash TEXT,
+    payload      TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    accessed     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_path ON entries(path);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed);
+"""
+
+GC_EVERY = 64  # sets between size/age sweeps
+
+
+class DiskCache:
+    """SQLite store of read/list payloads shared by every run in this project.
+
+    Entries are keyed by tool name and absolute target path. A lookup is
+    served when the stat signature still matches; for files whose stat moved
+    but whose bytes did not (touch, checkout, copy), the stored content hash
+    revalidates the entry instead of throwing it away. Files over
+    DISK_CACHE_HASH_MAX_BYTES get no hash, so caching a small window of a
+    huge file never reads the whole file. WAL mode lets several
+    agent processes read and write the same store concurrently.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DISK_CACHE_MAX_BYTES,
+                 max_age: float = DISK_CACHE_MAX_AGE_S) -> None:
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "tools.sqlite3")
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._sets = 0
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.gc()
+
+    def _key(self, name: str, args: Dict[str, Any]) -> str:
+        # absolute working dir so runs started from different cwds agree
+        wd = os.path.realpath(args.get("working_directory", "."))
+        return make_key(name, {**args, "working_directory": wd})
+
+    @profiler.timed("disk_cache.get")
+    def get(self, name: str, args: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = self._key(name, args)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path, signature, content_hash, payload FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        path, stored_sig, content_hash, payload = row
+        current = stat_signature(name, path, args)
+        if current is None:
+            self._delete(key)
+            return None
+        current_sig = json.dumps(current)
+        if current_sig != stored_sig:
+            # stat changed; only a matching content hash can save the entry
+            if (content_hash is None or current[-1] > DISK_CACHE_HASH_MAX_BYTES
+                    or file_digest(path) != content_hash):
+                self._delete(key)
+                return None
+        with self._lock:
+            self._db.execute("UPDATE entries SET signature = ?, accessed = ? WHERE key = ?",
+                             (current_sig, time.time(), key))
+        return json.loads(payload)
+
+    @profiler.timed("disk_cache.set")
+    def set(self, name: str, args: Dict[str, Any], payload: Dict[str, Any]) -> None:
+        path = target_path(name, args)
+        if path is None:
+            return
+        signature = stat_signature(name, path, args)
+        if signature is None:
+            return
+        content_hash = None
+        if name == "get_file_content" and signature[-1] <= DISK_CACHE_HASH_MAX_BYTES:
+            content_hash = file_digest(path)
+        blob = json.dumps(payload, default=str)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._key(name, args), name, path, json.dumps(signature),
+                 content_hash, blob, len(blob), time.time()),
+            )
+            self._sets += 1
+            due = self._sets % GC_EVERY == 0
+        if due:
+            self.gc()
+
+    def invalidate(self, path: str) -> None:
+        """Drop entries for `path` and for every directory listing above it."""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM entries WHERE path = ? OR substr(?, 1, length(path) + 1) = path || ?",
+                (path, path, os.sep),
+            )
+
+    def gc(self) -> int:
+        """Expire entries older than max_age, then trim LRU-first to max_bytes."""
+        removed = 0
+        with self._lock:
+            cur = self._db.execute("DELETE FROM entries WHERE accessed < ?",
+                                   (time.time() - self.max_age,))
+            removed += cur.rowcount
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                doomed = []
+                for key, size in self._db.execute(
+                        "SELECT key, size FROM entries ORDER BY accessed"):
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    total -= size
+                self._db.executemany("DELETE FROM entries WHERE key = ?", doomed)
+                removed += len(doomed)
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
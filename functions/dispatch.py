@@ -0,0 +1,97 @@
+# functions/dispatch.py
+import contextvars
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from functions.registry import READ, RUN, access_of
+
+
+@dataclass
+class ToolResult:
+    name: str
+    part: Any                 # function_response Part (None if malformed)
+    payload: Dict[str, Any]
+    elapsed: float = 0.0      # seconds spent in this call
+    cached: bool = False
+
+
+def call_path(args: Dict[str, Any]) -> str:
+    raw = args.get("file_path") or args.get("directory") or "."
+    return os.path.normpath(str(raw))
+
+
+def _paths_overlap(a: str, b: str) -> bool:
+    if a == b or a == "." or b == ".":
+        return True
+    return a.startswith(b + os.sep) or b.startswith(a + os.sep)
+
+
+def _conflicts(earlier: Tuple[str, str], later: Tuple[str, str]) -> bool:
+    (acc_a, path_a), (acc_b, path_b) = earlier, later
+    if acc_a == READ and acc_b == READ:
+        return False
+    if RUN in (acc_a, acc_b):
+        # a run can read or write any path, so it keeps its order against every call
+        return True
+    return _paths_overlap(path_a, path_b)
+
+
+class TurnDispatcher:
+    """Runs the tool calls of one model turn on a bounded worker pool.
+
+    Each call waits only for earlier calls it conflicts with, so independent
+    reads run side by side while writes and runs keep their order against
+    anything they could touch.
+    Results come back in submission order regardless of completion order.
+    """
+
+    def __init__(self, max_workers: int = 1) -> None:
+        self._pool: Optional[ThreadPoolExecutor] = None
+        if max_workers > 1:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._submitted: List[Tuple[Tuple[str, str], Future]] = []
+
+    def __enter__(self) -> "TurnDispatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def submit(self, name: str, args: Dict[str, Any], fn: Callable[[], ToolResult]) -> Future:
+        key = (access_of(name), call_path(args))
+        deps = [fut for prev, fut in self._submitted if _conflicts(prev, key)]
+
+        if self._pool is None:
+            fut: Future = Future()
+            fut.set_result(_timed(fn))
+        else:
+            # deps were queued earlier on the same FIFO pool, so they are
+            # already running (or done) by the time this call waits on them.
+            # The copied context keeps the session's output and log id.
+            fut = self._pool.submit(contextvars.copy_context().run, _run_after, deps, fn)
+        self._submitted.append((key, fut))
+        return fut
+
+    def results(self) -> List[ToolResult]:
+        return [fut.result() for _, fut in self._submitted]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+def _run_after(deps: List[Future], fn: Callable[[], ToolResult]) -> ToolResult:
+    if deps:
+        wait(deps)
+    return _timed(fn)
+
+
+def _timed(fn: Callable[[], ToolResult]) -> ToolResult:
+    start = time.perf_counter()
+    result = fn()
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -1,45 +1,144 @@
 # functions/get_file_content.py
-from google.genai import types
-from config import MAX_CHARS
+from config import MAX_CHARS, MMAP_THRESHOLD, BINARY_SNIFF_BYTES
+from functions.registry import READ, tool
+import functools
+import mimetypes
+import mmap
 import os
 
 # Function to read file content with security checks
-def get_file_content(file_path: str, working_directory: str):
+@tool(READ, cacheable=True, schema=lambda: schema_get_file_content())
+def get_file_content(file_path: str, working_directory: str, offset: int = None, limit: int = None,
+                     start_line: int = None, end_line: int = None):
     # Get the absolute path of the working directory
     base = os.path.realpath(working_directory)
     # Get the absolute path of the target file
     target = os.path.realpath(os.path.join(base, file_path))
-    
+
     # Check if the target file is within the allowed working directory
     if os.path.commonpath([base, target]) != base:
         return {"status":"error","kind":"read","details":"outside working dir"}
-    
+
     # Verify that the target is actually a file
     if not os.path.isfile(target):
         return {"status":"error","kind":"read","details":f'not a file: "{file_path}"'}
-    
+
     try:
-        # Read the file content with UTF-8 encoding and replace errors
-        with open(target, "r", encoding="utf-8", errors="replace") as f:
-            content = f.read()
-        # Return successful response with file content
-        return {"status":"ok","kind":"read","artifacts":{"file_path": file_path, "content": content}}
+        offset = None if offset is None else int(offset)
+        limit = None if limit is None else int(limit)
+        start_line = None if start_line is None else int(start_line)
+        end_line = None if end_line is None else int(end_line)
+    except (TypeError, ValueError):
+        return {"status":"error","kind":"read","details":"offset, limit, start_line and end_line must be integers"}
+    if any(v is not None and v < 0 for v in (offset, limit)) or any(v is not None and v < 1 for v in (start_line, end_line)):
+        return {"status":"error","kind":"read","details":"offset/limit must be >= 0 and line numbers >= 1"}
+
+    try:
+        with open(target, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # Sniff the head so binary files are summarised instead of decoded
+            head = f.read(BINARY_SNIFF_BYTES)
+            if _looks_binary(head):
+                return _binary_summary(file_path, target, size, head)
+            if size >= MMAP_THRESHOLD:
+                # Map large files so only the requested window is paged in
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    return _read_window(buf, size, file_path, offset, limit, start_line, end_line)
+            f.seek(0)
+            return _read_window(f.read(), size, file_path, offset, limit, start_line, end_line)
     except Exception as e:
         # Return error response if reading fails
         return {"status":"error","kind":"read","details": f"read failed: {e}"}
 
+def _looks_binary(head: bytes) -> bool:
+    if b"\x00" in head:
+        return True
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # a multi-byte character cut off at the end of the sniff is still text
+        return e.start < len(head) - 3
+    return False
+
+def _binary_summary(file_path, target, size, head):
+    mime, _ = mimetypes.guess_type(target)
+    return {"status":"ok","kind":"read",
+            "details": f"binary file, {size} bytes; content not shown",
+            "artifacts":{"file_path": file_path, "binary": True, "size": size,
+                         "mime": mime or "application/octet-stream", "head_hex": head[:32].hex()}}
+
+def _line_start(buf, line: int) -> int:
+    # Byte offset where 1-based `line` begins (len(buf) if past the end)
+    pos = 0
+    for _ in range(line - 1):
+        nl = buf.find(b"\n", pos)
+        if nl == -1:
+            return len(buf)
+        pos = nl + 1
+    return pos
+
+def _read_window(buf, size, file_path, offset, limit, start_line, end_line):
+    # Work out the requested byte window
+    if start_line is not None or end_line is not None:
+        start = _line_start(buf, start_line or 1)
+        end = size if end_line is None else _line_start(buf, end_line + 1)
+    else:
+        start = min(offset or 0, size)
+        end = size if limit is None else min(size, start + limit)
+    end = max(start, end)
+
+    # Enforce MAX_CHARS without splitting a UTF-8 character in half
+    stop = min(end, start + MAX_CHARS)
+    while start < stop < size and (buf[stop] & 0xC0) == 0x80:
+        stop -= 1
+    content = buf[start:stop].decode("utf-8", errors="replace")
+
+    artifacts = {"file_path": file_path, "content": content, "size": size, "offset": start,
+                 "end": stop, "truncated": stop < end}
+    if start_line is not None or end_line is not None:
+        artifacts["start_line"] = start_line or 1
+        if end_line is not None:
+            artifacts["end_line"] = end_line
+    if stop < end:
+        artifacts["next_offset"] = stop
+        artifacts["content"] += (f"\n[...truncated: showing bytes {start}-{stop} of {size}; "
+                                 f"read again with offset={stop} for more]")
+    return {"status":"ok","kind":"read","artifacts": artifacts}
+
 # Schema definition for the function declaration
-schema_get_file_content = types.FunctionDeclaration(
-    name="get_file_content",
-    description="Read the contents of the file requested in the specified directory constrained to the working directory.",
-    parameters=types.Schema(
-        type=types.Type.OBJECT,
-        properties={
-            "file_path": types.Schema(
-                type=types.Type.STRING,
-                description="The path to the file, relative to the working directory.",
-            ),
-        },
-        required=["file_path"],
-    ),
-)
\ No newline at end of file
+@functools.cache
+def schema_get_file_content():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="get_file_content",
+        description=(
+            "Read the contents of the file requested in the specified directory constrained to the working directory. "
+            f"At most {MAX_CHARS} bytes are returned per call; use offset/limit or start_line/end_line to page through larger files."
+        ),
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_path": types.Schema(
+                    type=types.Type.STRING,
+                    description="The path to the file, relative to the working directory.",
+                ),
+                "offset": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Optional byte offset to start reading from.",
+                ),
+                "limit": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Optional maximum number of bytes to read.",
+                ),
+                "start_line": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Optional first line to read (1-based). Takes precedence over offset/limit.",
+                ),
+                "end_line": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Optional last line to read (inclusive).",
+                ),
+            },
+            required=["file_path"],
+        ),
+    )
@@ -1,49 +1,207 @@
 # funtions/get_files_info.py
-from google.genai import types
+from config import LIST_PAGE_SIZE
+from functions.registry import READ, tool
+import fnmatch
+import functools
+import itertools
 import os
-from typing import Any, Dict, List, Optional, Callable
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Callable
+
+# Directories that are never worth showing to the model
+ALWAYS_SKIP = {".git", ".devdevbot"}  # VCS data and our own caches/backups
 
 # Function to list files in a directory with security checks
-def get_files_info(working_directory: str, directory: str = ".") ->dict:
-    
+@tool(READ, cacheable=True, schema=lambda: schema_get_files_info())
+def get_files_info(working_directory: str, directory: str = ".", recursive: bool = False,
+                   max_depth: int = None, include: List[str] = None, exclude: List[str] = None,
+                   respect_gitignore: bool = True, cursor: str = None, limit: int = None) ->dict:
+
     # Get the absolute path of the working directory
     abs_working_dir = os.path.realpath(working_directory)
     # Get the absolute path of the target directory
     target_dir = os.path.realpath(os.path.join(abs_working_dir, directory))
-    
+
     # Check if the target directory is within the allowed working directory
     if os.path.commonpath([abs_working_dir, target_dir]) != abs_working_dir:
         return {"status":"error","kind":"list","details":"outside working dir"}
-    
+
     # Verify that the target is actually a directory
     if not os.path.isdir(target_dir):
         return {"status":"error","kind":"list","details":f'not a directory: "{directory}"'}
 
-    # Initialize list to store directory entries
+    try:
+        start = int(cursor or 0)
+        page = min(int(limit or LIST_PAGE_SIZE), LIST_PAGE_SIZE)
+        depth_limit = None if max_depth is None else int(max_depth)
+    except (TypeError, ValueError):
+        return {"status":"error","kind":"list","details":"cursor, limit and max_depth must be integers"}
+    if start < 0 or page < 1:
+        return {"status":"error","kind":"list","details":"cursor must be >= 0 and limit >= 1"}
+    if not recursive:
+        depth_limit = 1
+
+    # .gitignore files from the working directory down to the listed directory apply
+    rel_target = os.path.relpath(target_dir, abs_working_dir)
+    chain = [] if rel_target == "." else rel_target.split(os.sep)
+    rules = []
+    if respect_gitignore:
+        for i in range(len(chain) + 1):
+            rules = rules + _load_gitignore(abs_working_dir, os.sep.join(chain[:i]))
+
+    walker = _walk(target_dir, "/".join(chain), "", 1, depth_limit, include or [], exclude or [],
+                   rules, respect_gitignore)
+    # Read one entry past the page so we know whether another page exists
+    page_entries = list(itertools.islice(walker, start, start + page + 1))
+    has_more = len(page_entries) > page
+
     entries = []
-    # Iterate through sorted directory contents
-    for name in sorted(os.listdir(target_dir)):
-        p = os.path.join(target_dir, name)
-        entries.append({
-            "name": name,
-            "is_dir": os.path.isdir(p),
-            "size": os.path.getsize(p) if os.path.isfile(p) else None,
-        })
-    
+    for path, entry, is_dir in page_entries[:page]:
+        item = {
+            "name": entry.name,
+            "is_dir": is_dir,
+            "size": entry.stat().st_size if entry.is_file() else None,
+        }
+        if recursive:
+            item["path"] = path
+        entries.append(item)
+
+    artifacts = {"directory": directory, "entries": entries}
+    if has_more:
+        artifacts["next_cursor"] = str(start + page)
     # Return successful response with directory listing
-    return {"status":"ok","kind":"list","artifacts":{"directory": directory, "entries": entries}}
+    return {"status":"ok","kind":"list","artifacts": artifacts}
+
+def walk_tree(working_directory: str, include: List[str] = None, exclude: List[str] = None,
+              respect_gitignore: bool = True) -> Iterator[Tuple[str, os.DirEntry, bool]]:
+    """Yield (path, DirEntry, is_dir) for everything under the working directory,
+    applying the same skip, glob and .gitignore rules as get_files_info."""
+    root = os.path.realpath(working_directory)
+    rules = _load_gitignore(root, "") if respect_gitignore else []
+    return _walk(root, "", "", 1, None, include or [], exclude or [], rules, respect_gitignore)
+
+def _walk(abs_dir: str, root_rel: str, rel: str, depth: int, max_depth: Optional[int],
+          include: List[str], exclude: List[str], rules: list,
+          respect_gitignore: bool) -> Iterator[Tuple[str, os.DirEntry, bool]]:
+    # `rel` is relative to the listed directory, `root_rel` is that directory
+    # relative to the working directory (what .gitignore rules are anchored to).
+    # One scandir per directory; DirEntry caches d_type so is_dir()/is_file() cost no syscalls
+    try:
+        with os.scandir(abs_dir) as it:
+            dir_entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+
+    for entry in dir_entries:
+        path = f"{rel}/{entry.name}" if rel else entry.name
+        root_path = f"{root_rel}/{path}" if root_rel else path
+        is_dir = entry.is_dir()
+        if is_dir and entry.name in ALWAYS_SKIP:
+            continue
+        if _ignored(rules, root_path, is_dir) or _matches(exclude, path):
+            continue
+
+        if not include or _matches(include, path):
+            yield path, entry, is_dir
+
+        # Don't follow symlinked directories so a link cycle can't recurse forever
+        if is_dir and not entry.is_symlink() and (max_depth is None or depth < max_depth):
+            sub_rules = rules
+            if respect_gitignore:
+                sub_rules = rules + _load_gitignore(entry.path, "", prefix=root_path)
+            yield from _walk(entry.path, root_rel, path, depth + 1, max_depth, include, exclude,
+                             sub_rules, respect_gitignore)
+
+def _matches(patterns: List[str], path: str) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    return any(fnmatch.fnmatch(path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+def _load_gitignore(base: str, rel: str, prefix: str = None) -> list:
+    # Parse a .gitignore into (prefix, pattern, negate, dir_only, anchored) rules
+    prefix = rel.replace(os.sep, "/") if prefix is None else prefix
+    try:
+        with open(os.path.join(base, rel, ".gitignore"), encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    rules = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        rules.append((prefix, line.lstrip("/"), negate, dir_only, anchored))
+    return rules
+
+def _ignored(rules: list, path: str, is_dir: bool) -> bool:
+    # Last matching rule wins, as in git
+    ignored = False
+    for prefix, pattern, negate, dir_only, anchored in rules:
+        if dir_only and not is_dir:
+            continue
+        if prefix:
+            if not path.startswith(prefix + "/"):
+                continue
+            local = path[len(prefix) + 1:]
+        else:
+            local = path
+        target = local if anchored else local.rsplit("/", 1)[-1]
+        if fnmatch.fnmatch(target, pattern):
+            ignored = not negate
+    return ignored
 
 # Schema definition for the function declaration
-schema_get_files_info = types.FunctionDeclaration(
-    name="get_files_info",
-    description="Lists files in the specified directory along with their sizes, constrained to the working directory.",
-    parameters=types.Schema(
-        type=types.Type.OBJECT,
-        properties={
-            "directory": types.Schema(
-                type=types.Type.STRING,
-                description="The directory to list files from, relative to the working directory.",
-            ),
-        },
-    ),
-)
\ No newline at end of file
+@functools.cache
+def schema_get_files_info():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="get_files_info",
+        description=(
+            "Lists files in the specified directory along with their sizes, constrained to the working directory. "
+            "Can walk subdirectories, filter with glob patterns and skips .gitignore'd files. "
+            f"Returns at most {LIST_PAGE_SIZE} entries per call; pass next_cursor back as cursor for the next page."
+        ),
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "directory": types.Schema(
+                    type=types.Type.STRING,
+                    description="The directory to list files from, relative to the working directory.",
+                ),
+                "recursive": types.Schema(
+                    type=types.Type.BOOLEAN,
+                    description="List subdirectories too. Entries then carry a 'path' relative to the listed directory.",
+                ),
+                "max_depth": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="With recursive, how many levels to descend (1 = only the directory itself).",
+                ),
+                "include": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(type=types.Type.STRING),
+                    description="Only show entries whose name or path matches one of these globs, e.g. ['*.py'].",
+                ),
+                "exclude": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(type=types.Type.STRING),
+                    description="Skip entries (and whole directories) whose name or path matches one of these globs.",
+                ),
+                "respect_gitignore": types.Schema(
+                    type=types.Type.BOOLEAN,
+                    description="Skip files ignored by .gitignore. Defaults to true.",
+                ),
+                "cursor": types.Schema(
+                    type=types.Type.STRING,
+                    description="Opaque cursor from a previous call's next_cursor.",
+                ),
+                "limit": types.Schema(
+                    type=types.Type.INTEGER,
+                    description=f"Maximum entries to return (at most {LIST_PAGE_SIZE}).",
+                ),
+            },
+        ),
+    )
@@ -0,0 +1,117 @@
+# functions/profiler.py
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Dict, List, Tuple
+
+_NULL = nullcontext()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.record(self.name, self.start, time.perf_counter() - self.start)
+
+
+class Profiler:
+    """Collects timed spans for --profile; a disabled profiler costs one check.
+
+        with profiler.span("model"):
+            ...
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.spans: List[Tuple[str, float, float, int]] = []  # (phase, start, seconds, thread)
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.spans.clear()
+
+    def span(self, name: str):
+        return _Span(self, name) if self.enabled else _NULL
+
+    def record(self, name: str, start: float, seconds: float) -> None:
+        """Add a span measured elsewhere (e.g. one that crosses an await)."""
+        if self.enabled:
+            # list.append is atomic, so spans from tool threads need no lock
+            self.spans.append((name, start, seconds, threading.get_ident()))
+
+    def timed(self, name: str):
+        """Decorator form of span() for functions on hot paths."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def phases(self) -> Dict[str, List[float]]:
+        by_phase: Dict[str, List[float]] = defaultdict(list)
+        for name, _, seconds, _ in list(self.spans):
+            by_phase[name].append(seconds)
+        return {name: sorted(values) for name, values in sorted(by_phase.items())}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: {"count": len(v), "p50": quantile(v, 0.5), "p95": quantile(v, 0.95), "total": sum(v)}
+                for name, v in self.phases().items()}
+
+    def print_report(self) -> None:
+        print(f"{'phase':<26}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'total ms':>11}")
+        for name, s in sorted(self.summary().items(), key=lambda item: -item[1]["total"]):
+            print(f"{name:<26}{s['count']:>7}{s['p50'] * 1e3:>10.2f}{s['p95'] * 1e3:>10.2f}"
+                  f"{s['total'] * 1e3:>11.1f}")
+
+    def write(self, path: str) -> None:
+        """Chrome trace for .json paths, Prometheus text format otherwise."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        text = self.chrome_trace() if path.endswith(".json") else self.prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def prometheus(self) -> str:
+        lines = ["# HELP devdevbot_phase_seconds Time spent per agent phase.",
+                 "# TYPE devdevbot_phase_seconds summary"]
+        for name, s in self.summary().items():
+            label = f'phase="{name}"'
+            lines.append(f'devdevbot_phase_seconds{{{label},quantile="0.5"}} {s["p50"]:.6f}')
+            lines.append(f'devdevbot_phase_seconds{{{label},quantile="0.95"}} {s["p95"]:.6f}')
+            lines.append(f"devdevbot_phase_seconds_sum{{{label}}} {s['total']:.6f}")
+            lines.append(f"devdevbot_phase_seconds_count{{{label}}} {s['count']}")
+        return "\n".join(lines) + "\n"
+
+    def chrome_trace(self) -> str:
+        """chrome://tracing / Perfetto "complete" events, one row per thread."""
+        pid = os.getpid()
+        events = [{"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": tid,
+                   "ts": round((start - self.origin) * 1e6, 1), "dur": round(seconds * 1e6, 1)}
+                  for name, start, seconds, tid in list(self.spans)]
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+
+
+def quantile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank quantile of an already sorted list (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+profiler = Profiler()
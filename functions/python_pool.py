@@ -0,0 +1,283 @@
+# functions/python_pool.py
+"""Warm interpreter pool for run_python_file.
+
+Each worker is a small `python python_pool.py --serve` process that imports
+the preload modules once and then forks a fresh child per run. The child
+gets the caller's pipes (passed over a Unix socket) as stdout/stderr, the
+requested cwd and argv, and runs the script as __main__, so the caller sees
+the same output and exit code as `python file.py args`. This file is run
+as a script on the worker side and must only import the stdlib at top level.
+"""
+import atexit
+import json
+import os
+import queue
+import resource
+import runpy
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Caller side
+# ---------------------------------------------------------------------------
+
+DRAIN_GRACE_S = 1.0  # how long past the timeout to keep reading a run's pipes
+
+
+class _Worker:
+    def __init__(self, preload: List[str]) -> None:
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", str(theirs.fileno()), *preload],
+            pass_fds=[theirs.fileno()],
+            stdin=subprocess.DEVNULL,
+        )
+        theirs.close()
+        self.sock = ours
+        self.replies = ours.makefile("r", encoding="utf-8")
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def send(self, request: dict, fds: List[int]) -> None:
+        socket.send_fds(self.sock, [json.dumps(request).encode("utf-8")], fds)
+
+    def receive(self) -> dict:
+        line = self.replies.readline()
+        if not line:
+            raise RuntimeError("python pool worker exited unexpectedly")
+        return json.loads(line)
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        finally:
+            if self.alive():
+                self.proc.kill()
+            self.proc.wait()
+
+
+class PythonPool:
+    """Up to `size` warm workers; each runs one script at a time."""
+
+    def __init__(self, size: int, preload: List[str]) -> None:
+        self.size = size
+        self.preload = list(preload)
+        # None is a wake-up: a worker was retired, so a waiting caller may start one
+        self._idle: "queue.LifoQueue[Optional[_Worker]]" = queue.LifoQueue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+    def warm(self) -> None:
+        with self._lock:
+            while self._started < self.size:
+                self._idle.put(_Worker(self.preload))
+                self._started += 1
+
+    def _checkout(self) -> _Worker:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if self._started < self.size:
+                        self._started += 1
+                        return _Worker(self.preload)
+                worker = self._idle.get()
+            if worker is None:
+                continue
+            if worker.alive():
+                return worker
+            self._retire(worker)
+
+    def _retire(self, worker: _Worker) -> None:
+        worker.close()
+        with self._lock:
+            self._started -= 1
+        self._idle.put(None)
+
+    def run(self, full_path: str, args: List[str], cwd: str, timeout: float, stdout, stderr,
+            limits: Optional[Dict[str, Tuple[int, int]]] = None) -> Tuple[int, bool, dict]:
+        """Run the script, feeding its output into the `stdout`/`stderr`
+        captures; returns (returncode, timed_out, resource report)."""
+        from functions.capture import drain
+        from functions.resources import usage
+
+        worker = self._checkout()
+        healthy = False
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            try:
+                worker.send({"path": full_path, "args": list(args), "cwd": cwd, "timeout": timeout,
+                             "limits": limits or {}}, [out_w, err_w])
+            finally:
+                # the child holds its own copies; EOF arrives when it exits
+                os.close(out_w)
+                os.close(err_w)
+            # the worker kills the script at `timeout`; a child the script
+            # left holding the pipes only gets the grace period on top
+            drain({out_r: stdout, err_r: stderr}, time.monotonic() + timeout + DRAIN_GRACE_S)
+            reply = worker.receive()
+            healthy = True
+        finally:
+            os.close(out_r)
+            os.close(err_r)
+            if healthy:
+                self._idle.put(worker)
+            else:
+                self._retire(worker)
+
+        return reply["returncode"], reply["timed_out"], usage(*reply["rusage"])
+
+    def close(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.close()
+
+
+_pool: Optional[PythonPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> PythonPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from config import PYTHON_POOL_PRELOAD, PYTHON_POOL_SIZE
+            _pool = PythonPool(PYTHON_POOL_SIZE, PYTHON_POOL_PRELOAD)
+            atexit.register(_pool.close)
+    return _pool
+
+
+def warm_up() -> None:
+    """Start the pool's workers now instead of on the first run."""
+    get_pool().warm()
+
+
+def run_in_pool(full_path: str, args: List[str], cwd: str, timeout: float, stdout, stderr,
+                limits: Optional[Dict[str, Tuple[int, int]]] = None) -> Tuple[int, bool, dict]:
+    return get_pool().run(full_path, args, cwd, timeout, stdout, stderr, limits)
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _serve(fd: int, preload: List[str]) -> None:
+    for name in preload:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+    # scripts should see the same sys.path as `python file.py`, not ours
+    here = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:] = [p for p in sys.path if p != here]
+    sock = socket.socket(fileno=fd)
+    while True:
+        try:
+            msg, fds, _, _ = socket.recv_fds(sock, 1 << 20, 2)
+        except OSError:
+            return
+        if not msg:
+            return
+        request = json.loads(msg)
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            sock.close()
+            _child(request, fds)  # never returns
+        for f in fds:
+            os.close(f)
+        returncode, timed_out, ru = _wait(pid, request["timeout"])
+        rusage = [ru.ru_utime, ru.ru_stime, ru.ru_maxrss, time.perf_counter() - started]
+        sock.sendall(json.dumps({"returncode": returncode, "timed_out": timed_out,
+                                 "rusage": rusage}).encode() + b"\n")
+
+
+def _wait(pid: int, timeout: float) -> Tuple[int, bool, "resource.struct_rusage"]:
+    deadline = time.monotonic() + timeout
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            pidfd = None
+    delay = 0.001
+    try:
+        while True:
+            done, status, ru = os.wait4(pid, os.WNOHANG)
+            if done:
+                return os.waitstatus_to_exitcode(status), False, ru
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                os.kill(pid, signal.SIGKILL)
+                _, status, ru = os.wait4(pid, 0)
+                return os.waitstatus_to_exitcode(status), True, ru
+            if pidfd is not None:
+                select.select([pidfd], [], [], remaining)
+            else:
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.05)
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+
+def _child(request: dict, fds: List[int]) -> None:
+    code = 1
+    try:
+        out_fd, err_fd = fds
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(out_fd, 1)
+        os.dup2(err_fd, 2)
+        for f in (devnull, out_fd, err_fd):
+            os.close(f)
+        atexit._clear()  # only the script's own handlers should run at exit
+        for name, pair in request["limits"].items():
+            resource.setrlimit(getattr(resource, name), tuple(pair))
+        os.chdir(request["cwd"])
+        full_path = request["path"]
+        sys.argv = [full_path] + request["args"]
+        sys.path.insert(0, os.path.dirname(full_path))
+
+        code = 0
+        try:
+            runpy.run_path(full_path, run_name="__main__")
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException as e:
+            # hide the runpy frames, as `python file.py` would
+            tb = e.__traceback__
+            while tb is not None and tb.tb_frame.f_code.co_filename != full_path:
+                tb = tb.tb_next
+            traceback.print_exception(type(e), e, tb or e.__traceback__)
+            code = 1
+        atexit._run_exitfuncs()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code & 0xFF)
+
+
+if __name__ == "__main__" and len(sys.argv) >= 3 and sys.argv[1] == "--serve":
+    _serve(int(sys.argv[2]), sys.argv[3:])
@@ -0,0 +1,74 @@
+# functions/registry.py
+"""One place that describes every tool the model can call.
+
+Each tool module decorates its implementation with @tool(...), giving how
+the call touches the workspace, whether its result may be cached and a
+builder for its schema. The argument whitelist comes from the function's
+signature, worked out once at registration instead of on every call.
+
+    @tool(READ, cacheable=True, schema=lambda: schema_get_file_content())
+    def get_file_content(working_directory: str, file_path: str, ...):
+"""
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+# How each tool touches the workspace. Reads can overlap freely, writes are
+# ordered per path, runs may touch any path so they are ordered against every
+# other call. Unknown tools are treated as runs to be safe.
+READ, WRITE, RUN = "read", "write", "run"
+
+
+@dataclass(frozen=True)
+class Tool:
+    name: str
+    fn: Callable[..., Any]
+    access: str
+    cacheable: bool
+    schema: Callable[[], Any]    # builds the FunctionDeclaration; called on first model request
+    params: FrozenSet[str]       # arguments the function accepts
+    required: Tuple[str, ...]    # ... and those without a default
+
+    def bind(self, supplied: Dict[str, Any], working_directory: str) -> Dict[str, Any]:
+        """Arguments for this tool: the accepted subset of what the model
+        sent (anything else is dropped) plus the sandbox root."""
+        args = {k: v for k, v in supplied.items() if k in self.params}
+        args["working_directory"] = working_directory
+        return args
+
+    def run(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Call the tool on bound arguments and return its payload."""
+        missing = [p for p in self.required if p not in args]
+        if missing:
+            return {"status": "error", "kind": self.name, "details": f"Missing argument(s): {', '.join(missing)}"}
+        try:
+            raw = self.fn(**args)
+        except Exception as exc:
+            return {"status": "error", "kind": self.name, "details": f"Exception: {exc}"}
+        return raw if isinstance(raw, dict) else {"status": "ok", "kind": self.name, "details": str(raw)}
+
+
+# registration order is the order the model sees the declarations in
+TOOLS: Dict[str, Tool] = {}
+
+
+def tool(access: str, schema: Callable[[], Any], cacheable: bool = False, name: Optional[str] = None):
+    """Register the decorated function as a tool; returns it unchanged."""
+    def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+        tool_name = name or fn.__name__
+        if tool_name in TOOLS:
+            raise ValueError(f"tool {tool_name!r} is already registered")
+        params = inspect.signature(fn).parameters
+        TOOLS[tool_name] = Tool(
+            name=tool_name, fn=fn, access=access, cacheable=cacheable, schema=schema,
+            params=frozenset(params),
+            required=tuple(p for p, spec in params.items()
+                           if spec.default is inspect.Parameter.empty and p != "working_directory"),
+        )
+        return fn
+    return register
+
+
+def access_of(name: str) -> str:
+    entry = TOOLS.get(name)
+    return entry.access if entry else RUN
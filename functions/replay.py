@@ -0,0 +1,198 @@
+# functions/replay.py
+"""Record model responses on disk and serve identical requests from there.
+
+A request is keyed by a hash of the model, system prompt, tool
+declarations and the contents sent. Timings that differ from one run to
+the next (durations, CPU time, RSS and test runner times in tool
+payloads) are masked before hashing, so rerunning the same conversation
+finds its recording. Prompts and file contents are hashed unchanged.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List
+
+from functions.utils import atomic_write
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+# tool payload keys whose values change on every run of the same tool call
+VOLATILE_KEYS = {"duration_s", "resources", "log", "cached"}
+# timings in a run payload's details: "in 0.12s", "cpu 0.03s", "max rss 12.5 MB"
+_MEASUREMENT = re.compile(r"\b\d+(?:\.\d+)?\s?(?:ms|s|KB|MB)\b")
+# test runner timing lines in run output: unittest's "Ran 3 tests in 0.001s",
+# pytest's "===== 3 passed in 0.12s ====="
+_TEST_TIMING = re.compile(r"^(Ran \d+ tests? in |=+ [^\n]*\b(?:passed|failed|errors?|skipped)\b[^\n]* in )"
+                          r"\d+(?:\.\d+)?s", re.MULTILINE)
+
+
+class ReplayMiss(Exception):
+    """--replay without --record found no recording for a request."""
+
+
+def _without_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _without_volatile(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_without_volatile(v) for v in value]
+    return value
+
+
+def _stable_payload(payload: Any) -> Any:
+    """A tool payload minus what differs between identical calls. Only run
+    payloads carry timings in their text; everything else the model sent or
+    read (prompts, file contents) is hashed as is."""
+    if not isinstance(payload, dict):
+        return payload
+    payload = _without_volatile(payload)
+    if payload.get("kind") == "run":
+        if isinstance(payload.get("details"), str):
+            payload["details"] = _MEASUREMENT.sub("#", payload["details"])
+        artifacts = payload.get("artifacts")
+        if isinstance(artifacts, dict):
+            for stream in ("stdout", "stderr"):
+                if isinstance(artifacts.get(stream), str):
+                    artifacts[stream] = _TEST_TIMING.sub(r"\1#", artifacts[stream])
+    return payload
+
+
+def _stable(content: Dict[str, Any]) -> Dict[str, Any]:
+    for part in content.get("parts") or []:
+        response = part.get("function_response")
+        if response and "response" in response:
+            response["response"] = _stable_payload(response["response"])
+    return content
+
+
+def request_key(api: str, model: str, contents: List[types.Content],
+                config: types.GenerateContentConfig) -> str:
+    doc = {
+        "api": api,
+        "model": model,
+        "system": config.system_instruction,
+        "tools": [t.model_dump(mode="json", exclude_none=True) for t in config.tools or []],
+        "contents": [_stable(c.model_dump(mode="json", exclude_none=True)) for c in contents],
+    }
+    blob = json.dumps(doc, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ReplayStore:
+    """One JSON file per request under <root>/<key[:2]>/<key>.json."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".json")
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                doc = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        from google.genai import types
+        return [types.GenerateContentResponse.model_validate(r) for r in doc["responses"]]
+
+    def put(self, key: str, model: str, responses: List[types.GenerateContentResponse]) -> None:
+        doc = {"key": key, "model": model,
+               "responses": [r.model_dump(mode="json", exclude_none=True) for r in responses]}
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, json.dumps(doc, indent=1).encode("utf-8"))
+
+
+class ReplayClient:
+    """Wraps a genai.Client (or None when only replaying).
+
+    replay: serve recorded responses; a miss raises ReplayMiss unless
+            `record` is also set, in which case it goes to the API.
+    record: send requests to the API and store what comes back.
+    """
+
+    def __init__(self, client: Any, store: ReplayStore, record: bool = False, replay: bool = False) -> None:
+        self.client = client
+        self.store = store
+        self.record = record
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self.models = _Models(self)
+        self.aio = _Aio(self)
+
+    def lookup(self, key: str):
+        if not self.replay:
+            return None
+        responses = self.store.get(key)
+        with self._lock:
+            if responses is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if responses is None and not self.record:
+            raise ReplayMiss(f"no recorded response for request {key[:12]} (rerun with --record)")
+        return responses
+
+    def save(self, key: str, model: str, responses: List[types.GenerateContentResponse]) -> None:
+        if self.record:
+            self.store.put(key, model, responses)
+            with self._lock:
+                self.recorded += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+
+class _Models:
+    def __init__(self, owner: ReplayClient) -> None:
+        self._owner = owner
+
+    def generate_content(self, *, model: str, contents: List[types.Content],
+                         config: types.GenerateContentConfig) -> types.GenerateContentResponse:
+        key = request_key("generate_content", model, contents, config)
+        recorded = self._owner.lookup(key)
+        if recorded is not None:
+            return recorded[0]
+        response = self._owner.client.models.generate_content(model=model, contents=contents, config=config)
+        self._owner.save(key, model, [response])
+        return response
+
+
+class _AioModels:
+    def __init__(self, owner: ReplayClient) -> None:
+        self._owner = owner
+
+    async def generate_content_stream(self, *, model: str, contents: List[types.Content],
+                                      config: types.GenerateContentConfig):
+        owner = self._owner
+        key = request_key("generate_content_stream", model, contents, config)
+        recorded = owner.lookup(key)
+        if recorded is not None:
+            async def replayed():
+                for chunk in recorded:
+                    yield chunk
+            return replayed()
+
+        stream = await owner.client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=config)
+
+        async def recording():
+            chunks = []
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+            owner.save(key, model, chunks)  # only complete streams are stored
+        return recording()
+
+
+class _Aio:
+    def __init__(self, owner: ReplayClient) -> None:
+        self.models = _AioModels(owner)
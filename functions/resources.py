@@ -0,0 +1,82 @@
+# functions/resources.py
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, runs are not measured
+    resource = None
+
+from config import RUN_LIMIT_AS_BYTES, RUN_LIMIT_CPU_S, RUN_LIMIT_FSIZE_BYTES
+
+# prlimit (Linux) can set a child's limits after it has been spawned
+HAS_PRLIMIT = resource is not None and hasattr(resource, "prlimit")
+
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_SCALE = 1 if sys.platform == "darwin" else 1024
+
+
+def configured_limits() -> Dict[str, Tuple[int, int]]:
+    """(soft, hard) pairs for the RLIMIT_* values switched on in config.py."""
+    if resource is None:
+        return {}
+    limits = {}
+    for name, value in (("RLIMIT_AS", RUN_LIMIT_AS_BYTES), ("RLIMIT_CPU", RUN_LIMIT_CPU_S),
+                        ("RLIMIT_FSIZE", RUN_LIMIT_FSIZE_BYTES)):
+        if value is None or not hasattr(resource, name):
+            continue
+        # a CPU soft limit sends SIGXCPU; the hard limit a second later kills
+        soft, hard = int(value), int(value) + 1 if name == "RLIMIT_CPU" else int(value)
+        _, current = resource.getrlimit(getattr(resource, name))
+        if current != resource.RLIM_INFINITY:
+            soft, hard = min(soft, current), min(hard, current)
+        limits[name] = (soft, hard)
+    return limits
+
+
+def apply_limits(limits: Dict[str, Tuple[int, int]], pid: Optional[int] = None) -> None:
+    """Set `limits` on `pid` (prlimit, Linux) or on the calling process."""
+    for name, pair in limits.items():
+        if pid is None:
+            resource.setrlimit(getattr(resource, name), pair)
+        else:
+            resource.prlimit(pid, getattr(resource, name), pair)
+
+
+def usage(user_s: float, sys_s: float, maxrss: int, wall_s: float) -> Dict[str, Any]:
+    """Resource report for one run, from wait4()'s rusage fields.
+
+    Linux carries a process's peak RSS across exec, so a script started
+    with Popen never reports less than the agent's own size at spawn time;
+    pool runs fork from a small worker and are much closer to the truth.
+    """
+    return {"wall_s": round(wall_s, 4), "user_cpu_s": round(user_s, 4),
+            "sys_cpu_s": round(sys_s, 4), "max_rss_bytes": int(maxrss) * _RSS_SCALE}
+
+
+class RunStats:
+    """Totals across a set of runs: run_stats for the whole process, and one
+    per Session in main.py for that conversation's own runs."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.peak_rss_bytes = 0
+
+    def record(self, report: Dict[str, Any]) -> None:
+        with self._lock:
+            self.runs += 1
+            self.wall_s += report["wall_s"]
+            self.cpu_s += report["user_cpu_s"] + report["sys_cpu_s"]
+            self.peak_rss_bytes = max(self.peak_rss_bytes, report["max_rss_bytes"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"runs": self.runs, "wall_s": round(self.wall_s, 3), "cpu_s": round(self.cpu_s, 3),
+                    "peak_rss_mb": round(self.peak_rss_bytes / (1024 * 1024), 1)}
+
+
+run_stats = RunStats()
@@ -0,0 +1,105 @@
+# functions/run_cache.py
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import RUN_CACHE_MAX_ENTRIES
+from functions.utils import file_digest
+
+# Never part of the workspace hash: VCS data, bytecode and our own state
+SKIP_DIRS = {".git", "__pycache__", ".devdevbot"}
+SKIP_SUFFIXES = (".pyc", ".pyo")
+
+
+class RunCache:
+    """Remembers run_python_file results for an unchanged workspace.
+
+    A result is keyed by interpreter, script, args and a hash over every file
+    under the working directory (sources and the data they might read). File
+    digests are memoised by stat signature, so hashing an unchanged tree only
+    costs a directory walk. Any edit, through write_file or otherwise, changes
+    the hash and therefore the key, so stale results are never served.
+    """
+
+    def __init__(self, max_entries: int = RUN_CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # key -> run artifacts
+        self._digests: Dict[str, Tuple[tuple, str]] = {}  # abs path -> (stat sig, sha256)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def workspace_hash(self, root: str) -> str:
+        h = hashlib.sha256()
+        for rel, abs_path, st in sorted(_walk_files(root)):
+            sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+            with self._lock:
+                memo = self._digests.get(abs_path)
+            if memo is None or memo[0] != sig:
+                digest = file_digest(abs_path)
+                if digest is None:
+                    continue
+                memo = (sig, digest)
+                with self._lock:
+                    self._digests[abs_path] = memo
+            h.update(f"{rel}\0{memo[1]}\n".encode("utf-8", "surrogateescape"))
+        return h.hexdigest()
+
+    def key(self, root: str, full_path: str, args: List[str]) -> str:
+        rel = os.path.relpath(full_path, root)
+        raw = json.dumps([sys.executable, rel, list(args), self.workspace_hash(root)])
+        return hashlib.sha256(raw.encode("utf-8", "surrogateescape")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return dict(result)
+
+    def put(self, key: str, artifacts: Dict[str, Any]) -> None:
+        with self._lock:
+            self._results[key] = dict(artifacts)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def invalidate(self, path: str) -> None:
+        """Forget the memoised digest of `path` so the next hash re-reads it.
+
+        Needed for writes landing within the filesystem's mtime granularity,
+        where the stat signature alone could miss the change.
+        """
+        with self._lock:
+            self._digests.pop(os.path.realpath(path), None)
+
+
+def _walk_files(root: str):
+    stack = [(os.path.realpath(root), "")]
+    while stack:
+        abs_dir, rel_dir = stack.pop()
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIP_DIRS:
+                    stack.append((entry.path, rel))
+            elif entry.is_file() and not entry.name.endswith(SKIP_SUFFIXES):
+                try:
+                    yield rel, entry.path, entry.stat()
+                except OSError:
+                    continue
+
+
+run_cache = RunCache()
@@ -1,10 +1,19 @@
 # functions/run_python.py
+import functools
 import os
+import signal
 import sys
 from os import path
 import subprocess
-from google.genai import types
+import time
+from config import PYTHON_POOL, RUN_CACHE, RUN_OUTPUT_LOG_DIR, RUN_TIMEOUT_S
+from functions.capture import BoundedCapture, drain
+from functions.resources import HAS_PRLIMIT, apply_limits, configured_limits, run_stats, usage
+from functions.run_cache import run_cache
+from functions.test_summary import parse_test_summary
+from functions.registry import RUN, tool
 
+@tool(RUN, schema=lambda: schema_run_python_file())
 def run_python_file(
     working_directory,
     file_path, 
@@ -21,69 +30,210 @@ def run_python_file(
 
     # ----- 1. Directory containment check  -----
     if os.path.commonpath([abs_work_dir, full_path]) != abs_work_dir:
-        return (
-            f'Error: Cannot execute "{file_path}" as it is outside the permitted working directory'
-        )
+        return _error(f'Cannot execute "{file_path}" as it is outside the permitted working directory')
 
     # ----- 2. File existence check  -----
     if not os.path.exists(full_path):
-        return f'Error: File "{file_path}" not found.'
+        return _error(f'File "{file_path}" not found.')
 
     # ----- 3. Ensure a Python file  -----
     if not file_path.endswith(".py"):
-        return f'Error: File "{file_path}" is not a Python file.'
+        return _error(f'File "{file_path}" is not a Python file.')
 
     # ----- 4. Build the command -----
     cmd = [sys.executable, full_path] + args 
     
-    # ----- 5. Execute the command -----
+    # ----- 5. Reuse the last result if nothing in the workspace changed -----
+    cache_key = None
+    if RUN_CACHE:
+        cache_key = run_cache.key(abs_work_dir, full_path, args)
+        cached = run_cache.get(cache_key)
+        if cached is not None:
+            return _run_payload(dict(cached, cached=True))
 
+    # ----- 6. Execute the command, keeping a bounded head/tail of each stream -----
+    out_log = err_log = None
+    started = time.perf_counter()
     try:
-        result = subprocess.run(
-            args=cmd,
-            cwd=abs_work_dir,
-            capture_output=True,
-            text=True,
-            timeout=10,
-            check=False,  # we will handle non‑zero exit codes ourselves
-        )
+        out_log, err_log = _open_logs(full_path)
+        out, err = BoundedCapture(tee=out_log), BoundedCapture(tee=err_log)
+        limits = configured_limits()
+        if PYTHON_POOL:
+            # fork from the warm interpreter instead of starting a new one
+            from functions.python_pool import run_in_pool
+            returncode, timed_out, report = run_in_pool(full_path, args, abs_work_dir, RUN_TIMEOUT_S,
+                                                        out, err, limits)
+        else:
+            returncode, timed_out, report = _run_captured(cmd, abs_work_dir, RUN_TIMEOUT_S, out, err, limits)
+    except Exception as e:  # Catch any other exception
+        return _error(f"executing Python file: {e}")
+    finally:
+        for log in (out_log, err_log):
+            if log is not None:
+                log.close()
 
-        output_parts = []
+    # ----- 7. Describe the run -----
+    stdout, stderr = out.text(), err.text()
+    if report is not None:
+        run_stats.record(report)
+    artifacts = {
+        "file_path": file_path,
+        "args": list(args),
+        "returncode": None if timed_out else returncode,
+        "timed_out": timed_out,
+        "signal": _signal_name(returncode),
+        "duration_s": round(time.perf_counter() - started, 4),
+        "resources": report,
+        "stdout": stdout,
+        "stderr": stderr,
+        "stdout_dropped": out.dropped,
+        "stderr_dropped": err.dropped,
+        "tests": parse_test_summary(stdout + "\n" + stderr),
+        "cached": False,
+    }
+    if cache_key is not None and not timed_out:
+        run_cache.put(cache_key, artifacts)
+    if out_log is not None:
+        artifacts["log"] = out_log.name[:-len(".stdout.log")] + ".{stdout,stderr}.log"
+    return _run_payload(artifacts)
 
-        if result.stdout:
-            output_parts.append(f"STDOUT:\n{result.stdout.strip()}")
-        if result.stderr:
-            output_parts.append(f"STDERR:\n{result.stderr.strip()}")
-        if result.returncode != 0:
-            output_parts.append(f"Process exited with code {result.returncode}")
+# what a script hitting one of the configured RLIMITs is killed with
+LIMIT_SIGNALS = {"SIGXCPU": " (RUN_LIMIT_CPU_S reached)", "SIGXFSZ": " (RUN_LIMIT_FSIZE_BYTES reached)"}
 
-        return "\n".join(output_parts) if output_parts else "No output produced."
+def _error(details):
+    return {"status": "error", "kind": "run", "details": details}
 
-    except subprocess.TimeoutExpired as e:
-        return f"Error: executing Python file - timed out after {e.timeout}s"
+def _run_payload(artifacts):
+    returncode = artifacts["returncode"]
+    if returncode is None:
+        details = f"timed out after {RUN_TIMEOUT_S}s"
+    elif artifacts.get("signal"):
+        details = f"killed by {artifacts['signal']} after {artifacts['duration_s']:.2f}s"
+        details += LIMIT_SIGNALS.get(artifacts["signal"], "")
+    else:
+        details = f"exited with code {returncode} in {artifacts['duration_s']:.2f}s"
+    report = artifacts.get("resources")
+    if report:
+        details += (f" (cpu {report['user_cpu_s'] + report['sys_cpu_s']:.2f}s, "
+                    f"max rss {report['max_rss_bytes'] / (1024 * 1024):.1f} MB)")
+    tests = artifacts.get("tests")
+    if tests:
+        details += (f"; {tests['framework']}: {tests['passed']} passed, {tests['failed']} failed, "
+                    f"{tests['errors']} errors, {tests['skipped']} skipped")
+    dropped = artifacts["stdout_dropped"] + artifacts["stderr_dropped"]
+    if dropped:
+        details += f"; {dropped} bytes of output dropped from the middle"
+    if artifacts.get("cached"):
+        details += "; cached (workspace unchanged since an identical run)"
+    return {"status": "error" if returncode is None else "ok", "kind": "run",
+            "details": details, "artifacts": artifacts}
 
-    except Exception as e:  # Catch any other exception
-        return f"Error: executing Python file: {e}"
-
-schema_run_python_file = types.FunctionDeclaration(
-    name="run_python_file",
-    description=(
-        "Execute a Python file relative to the working directory and return "
-        "its stdout, stderr, and exit code."
-    ),
-    parameters=types.Schema(
-        type=types.Type.OBJECT,
-        properties={
-            "file_path": types.Schema(
-                type=types.Type.STRING,
-                description="Relative path to the Python file to execute.",
-            ),
-            "args": types.Schema(
-                type=types.Type.ARRAY,
-                items=types.Schema(type=types.Type.STRING),
-                description="Optional list of command-line arguments.",
-            ),
-        },
-        required=["file_path"],
-    ),
-)
+def _run_captured(cmd, cwd, timeout, out, err, limits):
+    """Run `cmd`, streaming its pipes into bounded captures.
+
+    Returns (returncode, timed_out, resource report); the report is None
+    where wait4() is unavailable.
+    """
+    # prlimit sets the limits from outside; preexec_fn is the fallback since
+    # it is not safe to fork with it while other tool threads are running
+    preexec = None
+    if limits and not HAS_PRLIMIT:
+        preexec = lambda: apply_limits(limits)
+    started = time.perf_counter()
+    with subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          preexec_fn=preexec) as proc:
+        if limits and preexec is None:
+            try:
+                apply_limits(limits, proc.pid)
+            except ProcessLookupError:
+                pass  # already gone
+        deadline = time.monotonic() + timeout
+        fds = {proc.stdout.fileno(): out, proc.stderr.fileno(): err}
+        # EOF is not the end of the run: the script may close its pipes and
+        # keep going, or exit and leave a child holding them. Either way the
+        # script itself gets until the deadline.
+        drained = drain(fds, deadline)
+        if not hasattr(os, "wait4"):
+            try:
+                return proc.wait(timeout=max(deadline - time.monotonic(), 0)), False, None
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                if not drained:
+                    drain(fds, time.monotonic() + 1)
+                return proc.wait(), True, None
+        reaped = _wait4_until(proc.pid, deadline)
+        timed_out = reaped is None
+        if timed_out:
+            proc.kill()
+            if not drained:
+                # pick up whatever was written before the kill
+                drain(fds, time.monotonic() + 1)
+            try:
+                _, status, ru = os.wait4(proc.pid, 0)
+            except ChildProcessError:
+                # exited between the last check and kill(), which reaped it
+                return proc.returncode, timed_out, None
+            reaped = status, ru
+        status, ru = reaped
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        report = usage(ru.ru_utime, ru.ru_stime, ru.ru_maxrss, time.perf_counter() - started)
+        return proc.returncode, timed_out, report
+
+def _wait4_until(pid, deadline):
+    """(status, rusage) once `pid` exits, or None if `deadline` passes first."""
+    delay = 0.001
+    while True:
+        done, status, ru = os.wait4(pid, os.WNOHANG)
+        if done:
+            return status, ru
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+
+def _signal_name(returncode):
+    if returncode is None or returncode >= 0:
+        return None
+    try:
+        return signal.Signals(-returncode).name
+    except ValueError:
+        return f"signal {-returncode}"
+
+def _open_logs(full_path):
+    """Files receiving the complete stdout/stderr when RUN_OUTPUT_LOG_DIR is set."""
+    if not RUN_OUTPUT_LOG_DIR:
+        return None, None
+    os.makedirs(RUN_OUTPUT_LOG_DIR, exist_ok=True)
+    stem = os.path.join(
+        RUN_OUTPUT_LOG_DIR,
+        f"{time.strftime('%Y%m%d-%H%M%S')}-{time.monotonic_ns()}-{path.basename(full_path)}",
+    )
+    return open(stem + ".stdout.log", "wb"), open(stem + ".stderr.log", "wb")
+
+@functools.cache
+def schema_run_python_file():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="run_python_file",
+        description=(
+            "Execute a Python file relative to the working directory and return "
+            "its stdout, stderr, exit code, duration, and a pass/fail summary when "
+            "the output is from unittest or pytest."
+        ),
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_path": types.Schema(
+                    type=types.Type.STRING,
+                    description="Relative path to the Python file to execute.",
+                ),
+                "args": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(type=types.Type.STRING),
+                    description="Optional list of command-line arguments.",
+                ),
+            },
+            required=["file_path"],
+        ),
+    )
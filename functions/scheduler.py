@@ -0,0 +1,228 @@
+# functions/scheduler.py
+"""Client-side rate limiting and retries for model requests.
+
+ScheduledClient wraps a genai.Client for one session. Every request first
+takes its share from the process-wide request and token buckets (so
+sessions running side by side queue up instead of all hitting the quota),
+then retries 429/5xx and connection errors with jittered exponential
+backoff, or after the server's retry hint when it sends one. Nothing is
+retried past the session deadline.
+"""
+import random
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config import (API_BACKOFF_BASE_S, API_BACKOFF_MAX_S, API_MAX_RETRIES, API_RPM, API_TPM,
+                    SESSION_DEADLINE_S)
+from functions.context import request_chars
+from functions.profiler import profiler
+
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+_DELAY = re.compile(r"^(\d+(?:\.\d+)?)s$")  # google.rpc.RetryInfo "retryDelay": "12.5s"
+
+
+class DeadlineExceeded(Exception):
+    """The session's time budget ran out before a request could be made."""
+
+
+class TokenBucket:
+    """`rate` units per minute, bursting up to one minute's worth.
+
+    reserve() takes the units at once and returns how long the caller must
+    wait before using them; the balance may go negative, so callers queue in
+    the order they asked.
+    """
+
+    def __init__(self, rate: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.clock = clock
+        self.tokens = float(rate)
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / 60)
+            self.updated = now
+            self.tokens -= min(amount, self.rate)  # one oversized request must not wait forever
+            return 0.0 if self.tokens >= 0 else -self.tokens * 60 / self.rate
+
+    def refund(self, amount: float) -> None:
+        """Settle an estimate: positive gives tokens back, negative takes more."""
+        with self._lock:
+            self.tokens = min(self.rate, self.tokens + amount)
+
+
+class RateLimiter:
+    """The request (RPM) and token (TPM) buckets shared by every session."""
+
+    def __init__(self, rpm: Optional[float] = API_RPM, tpm: Optional[float] = API_TPM,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.requests = TokenBucket(rpm, clock) if rpm else None
+        self.tokens = TokenBucket(tpm, clock) if tpm else None
+
+    def reserve(self, tokens: int) -> float:
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        if self.tokens and actual:
+            self.tokens.refund(estimated - actual)
+
+
+rate_limiter = RateLimiter()
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if getattr(exc, "code", None) in RETRYABLE_CODES or isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # the SDK's HTTP layer; if it was never imported, exc cannot be one of its errors
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(exc, httpx.TransportError)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait: Retry-After header or RetryInfo detail."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is not None:
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    details = getattr(exc, "details", None)
+    if not isinstance(details, dict):
+        return None
+    error = details.get("error", details)
+    for item in (error.get("details") if isinstance(error, dict) else None) or []:
+        match = _DELAY.match(str(item.get("retryDelay", ""))) if isinstance(item, dict) else None
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def estimate_tokens(contents: Any, config: Any) -> int:
+    system = getattr(config, "system_instruction", None)
+    return (request_chars(contents) + len(system if isinstance(system, str) else "")) // 4
+
+
+class ScheduledClient:
+    """Wraps a genai.Client; one instance per session, as it owns the deadline."""
+
+    def __init__(self, client: Any, deadline_s: Optional[float] = SESSION_DEADLINE_S,
+                 limiter: Optional[RateLimiter] = None, max_retries: int = API_MAX_RETRIES,
+                 base_s: float = API_BACKOFF_BASE_S, max_s: float = API_BACKOFF_MAX_S,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 rng: Callable[[], float] = random.random) -> None:
+        self.client = client
+        self.limiter = limiter or rate_limiter
+        self.max_retries = max_retries
+        self.base_s = base_s
+        self.max_s = max_s
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng
+        self.deadline = None if deadline_s is None else clock() + deadline_s
+        self.requests = 0
+        self.retries = 0
+        self.throttled_s = 0.0  # waiting for the rate limiter
+        self.backoff_s = 0.0    # waiting between retries
+        self.models = _Models(self)
+        self.aio = _Aio(self)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "retries": self.retries,
+                "throttled_s": round(self.throttled_s, 3), "backoff_s": round(self.backoff_s, 3)}
+
+    def _check_wait(self, wait: float, why: str) -> None:
+        if self.deadline is not None and self.clock() + wait > self.deadline:
+            raise DeadlineExceeded(f"session deadline reached ({why}, {wait:.1f}s wait needed)")
+
+    def _throttle(self, tokens: int) -> float:
+        """Seconds to wait before sending; the wait is accounted as throttled."""
+        wait = self.limiter.reserve(tokens)
+        self._check_wait(wait, "rate limit")
+        if wait:
+            self.throttled_s += wait
+            profiler.record("api.throttle", time.perf_counter(), wait)
+        return wait
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        """Seconds to wait before retry number `attempt`, or re-raise `exc`."""
+        if attempt > self.max_retries or not is_retryable(exc):
+            raise exc
+        hint = retry_after(exc)
+        if hint is not None:
+            wait = hint + self.rng() * self.base_s
+        else:  # "full jitter": anywhere up to the exponential ceiling
+            wait = self.rng() * min(self.max_s, self.base_s * 2 ** (attempt - 1))
+        self._check_wait(wait, f"retrying after: {exc}")
+        self.retries += 1
+        self.backoff_s += wait
+        profiler.record("api.backoff", time.perf_counter(), wait)
+        return wait
+
+    def _settle(self, estimated: int, response: Any) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        self.limiter.settle(estimated, getattr(usage, "total_token_count", None))
+
+    def call(self, fn: Callable[[], Any], tokens: int) -> Any:
+        attempt = 0
+        while True:
+            wait = self._throttle(tokens)
+            if wait:
+                self.sleep(wait)
+            attempt += 1
+            self.requests += 1
+            try:
+                return fn()
+            except Exception as exc:
+                self.sleep(self._backoff(attempt, exc))
+
+    async def acall(self, fn: Callable[[], Any], tokens: int) -> Any:
+        import asyncio
+        attempt = 0
+        while True:
+            wait = self._throttle(tokens)
+            if wait:
+                await asyncio.sleep(wait)
+            attempt += 1
+            self.requests += 1
+            try:
+                return await fn()
+            except Exception as exc:
+                await asyncio.sleep(self._backoff(attempt, exc))
+
+
+class _Models:
+    def __init__(self, owner: ScheduledClient) -> None:
+        self._owner = owner
+
+    def generate_content(self, **kwargs: Any) -> Any:
+        owner = self._owner
+        tokens = estimate_tokens(kwargs.get("contents") or [], kwargs.get("config"))
+        response = owner.call(lambda: owner.client.models.generate_content(**kwargs), tokens)
+        owner._settle(tokens, response)
+        return response
+
+
+class _AioModels:
+    def __init__(self, owner: ScheduledClient) -> None:
+        self._owner = owner
+
+    async def generate_content_stream(self, **kwargs: Any) -> Any:
+        # only opening the stream is retried; once chunks have been shown, a
+        # failure surfaces to the caller
+        owner = self._owner
+        tokens = estimate_tokens(kwargs.get("contents") or [], kwargs.get("config"))
+        return await owner.acall(lambda: owner.client.aio.models.generate_content_stream(**kwargs), tokens)
+
+
+class _Aio:
+    def __init__(self, owner: ScheduledClient) -> None:
+        self.models = _AioModels(owner)
@@ -0,0 +1,229 @@
+# functions/search_code.py
+import fnmatch
+import functools
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+
+from config import SEARCH_MAX_FILE_BYTES, SEARCH_MAX_RESULTS
+from functions.get_files_info import walk_tree
+from functions.registry import READ, tool
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse, sre_constants
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """In-memory trigram index over the text files of one working directory.
+
+    refresh() re-stats the tree and only re-reads files whose (mtime_ns, size)
+    moved, so after the first build a search costs one directory walk plus
+    the lines of the files that can actually match.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.lock = threading.Lock()
+        self.stamps: Dict[str, Tuple[int, int]] = {}     # path -> (mtime_ns, size)
+        self.lines: Dict[str, List[str]] = {}
+        self.grams: Dict[str, Set[str]] = {}             # path -> its trigrams
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the disk; returns files re-read."""
+        seen = set()
+        changed = 0
+        for path, entry, is_dir in walk_tree(self.root):
+            if is_dir or not entry.is_file():
+                continue
+            st = entry.stat()
+            seen.add(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+            if self.stamps.get(path) == stamp:
+                continue
+            self._drop(path)
+            self.stamps[path] = stamp
+            if st.st_size <= SEARCH_MAX_FILE_BYTES:
+                self._add(path, entry.path)
+            changed += 1
+        for path in set(self.stamps) - seen:
+            self._drop(path)
+            del self.stamps[path]
+        return changed
+
+    def candidates(self, needles: List[str]) -> List[str]:
+        # every trigram of every required literal must occur in the file
+        wanted = set()
+        for needle in needles:
+            wanted |= _trigrams(needle.lower())
+        if not wanted:
+            return sorted(self.lines)
+        result: Optional[Set[str]] = None
+        for gram in sorted(wanted, key=lambda g: len(self.postings.get(g, ()))):
+            posting = self.postings.get(gram, set())
+            result = set(posting) if result is None else result & posting
+            if not result:
+                return []
+        return sorted(result)
+
+    def _add(self, path: str, abs_path: str) -> None:
+        try:
+            with open(abs_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        if b"\x00" in data[:8192]:
+            return  # binary
+        text = data.decode("utf-8", errors="replace")
+        grams = _trigrams(text.lower())
+        self.lines[path] = text.splitlines()
+        self.grams[path] = grams
+        for gram in grams:
+            self.postings[gram].add(path)
+
+    def _drop(self, path: str) -> None:
+        self.lines.pop(path, None)
+        for gram in self.grams.pop(path, ()):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(path)
+                if not posting:
+                    del self.postings[gram]
+
+
+_indexes: Dict[str, TrigramIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(working_directory: str) -> TrigramIndex:
+    root = os.path.realpath(working_directory)
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = TrigramIndex(root)
+    return index
+
+
+def required_literals(pattern: str) -> List[str]:
+    """Literal runs every match of `pattern` must contain (may be empty)."""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return []
+    runs, current = [], []
+    for op, arg in parsed:
+        if op is sre_constants.LITERAL:
+            current.append(chr(arg))
+            continue
+        if op is sre_constants.BRANCH:
+            return []  # top-level alternation: nothing is required
+        if current:
+            runs.append("".join(current))
+            current = []
+    if current:
+        runs.append("".join(current))
+    return [r for r in runs if len(r) >= 3]
+
+
+@tool(READ, schema=lambda: schema_search_code())
+def search_code(working_directory: str, query: str, regex: bool = False, case_sensitive: bool = True,
+                include: List[str] = None, context: int = 2, max_results: int = None):
+    if not query:
+        return {"status": "error", "kind": "search", "details": "query must not be empty"}
+    flags = 0 if case_sensitive else re.IGNORECASE
+    try:
+        matcher = re.compile(query if regex else re.escape(query), flags)
+        context = max(0, min(int(context), 10))
+        limit = min(int(max_results or SEARCH_MAX_RESULTS), SEARCH_MAX_RESULTS)
+    except re.error as e:
+        return {"status": "error", "kind": "search", "details": f"bad regex: {e}"}
+    except (TypeError, ValueError):
+        return {"status": "error", "kind": "search", "details": "context and max_results must be integers"}
+
+    index = get_index(working_directory)
+    needles = required_literals(query) if regex else [query]
+    matches = []
+    scanned = 0  # files whose lines were read; fewer than the candidates once truncated
+    truncated = False
+    with index.lock:
+        index.refresh()
+        candidates = index.candidates(needles)
+        if include:
+            candidates = [c for c in candidates
+                          if any(fnmatch.fnmatch(c, p) or fnmatch.fnmatch(c.rsplit("/", 1)[-1], p)
+                                 for p in include)]
+        for path in candidates:
+            scanned += 1
+            lines = index.lines[path]
+            for i, line in enumerate(lines):
+                if not matcher.search(line):
+                    continue
+                if len(matches) >= limit:
+                    truncated = True
+                    break
+                matches.append({
+                    "path": path,
+                    "line": i + 1,
+                    "text": line,
+                    "before": lines[max(0, i - context):i],
+                    "after": lines[i + 1:i + 1 + context],
+                })
+            if truncated:
+                break
+
+    return {"status": "ok", "kind": "search",
+            "artifacts": {"query": query, "matches": matches, "files_searched": scanned,
+                          "files_indexed": len(index.lines), "truncated": truncated}}
+
+
+@functools.cache
+def schema_search_code():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="search_code",
+        description=(
+            "Search the text files in the working directory for a literal string or regular expression "
+            "and return matching lines with line numbers and surrounding context. Much cheaper than "
+            "reading files one by one to find something."
+        ),
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "query": types.Schema(
+                    type=types.Type.STRING,
+                    description="Text to search for, or a Python regular expression if regex is true.",
+                ),
+                "regex": types.Schema(
+                    type=types.Type.BOOLEAN,
+                    description="Treat query as a regular expression. Defaults to false.",
+                ),
+                "case_sensitive": types.Schema(
+                    type=types.Type.BOOLEAN,
+                    description="Match case exactly. Defaults to true.",
+                ),
+                "include": types.Schema(
+                    type=types.Type.ARRAY,
+                    items=types.Schema(type=types.Type.STRING),
+                    description="Only search files whose name or path matches one of these globs, e.g. ['*.py'].",
+                ),
+                "context": types.Schema(
+                    type=types.Type.INTEGER,
+                    description="Lines of context before and after each match (default 2, max 10).",
+                ),
+                "max_results": types.Schema(
+                    type=types.Type.INTEGER,
+                    description=f"Maximum matches to return (at most {SEARCH_MAX_RESULTS}).",
+                ),
+            },
+            required=["query"],
+        ),
+    )
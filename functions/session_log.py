@@ -0,0 +1,204 @@
+# functions/session_log.py
+"""Structured conversation log: one JSON object per line.
+
+The agent loop calls JsonlLogger.log(), which only puts the event on a
+queue; a background thread encodes and writes it through a buffered file
+and rotates the file once it passes max_bytes (path -> path.1 -> ... ->
+path.N), so logging never waits on disk inside a turn.
+
+    python -m functions.session_log summarise [conversation.jsonl ...]
+"""
+import argparse
+import atexit
+import contextvars
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import LOG_BACKUPS, LOG_MAX_BYTES, LOG_PATH
+from functions.profiler import profiler, quantile
+
+_STOP = object()
+# set while a session runs so events from concurrent sessions (--serve,
+# --batch) carry their own id rather than the logger's
+session_id: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("session_id", default=None)
+
+
+class JsonlLogger:
+    def __init__(self, path: str = LOG_PATH, max_bytes: int = LOG_MAX_BYTES,
+                 backups: int = LOG_BACKUPS) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.session = uuid.uuid4().hex[:12]
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=10000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @profiler.timed("log.enqueue")
+    def log(self, event: Dict[str, Any]) -> None:
+        """Queue `event` for writing; never blocks the caller."""
+        if self._thread is None:
+            self._start()
+        record = {"ts": round(time.time(), 3), "session": session_id.get() or self.session, **event}
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Write everything queued so far and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name="session-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        f = open(self.path, "ab", buffering=1 << 16)
+        # counted here rather than asked of the file: tell() would flush the buffer
+        size = f.seek(0, os.SEEK_END)
+        try:
+            while True:
+                record = self._queue.get()
+                if record is _STOP:
+                    return
+                with profiler.span("log.write"):
+                    line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+                    f.write(line)
+                    size += len(line)
+                    if self._queue.empty():
+                        f.flush()  # idle: make what we have visible
+                if self.max_bytes and size >= self.max_bytes:
+                    f.close()
+                    self._rotate()
+                    f = open(self.path, "ab", buffering=1 << 16)
+                    size = 0
+        finally:
+            f.close()
+
+    def _rotate(self) -> None:
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+def usage_counts(usage: Any) -> Dict[str, int]:
+    """Non-empty token counts from a response's usage_metadata."""
+    if usage is None:
+        return {}
+    fields = ("prompt_token_count", "candidates_token_count", "cached_content_token_count",
+              "thoughts_token_count", "tool_use_prompt_token_count", "total_token_count")
+    return {f: getattr(usage, f) for f in fields if getattr(usage, f, None)}
+
+
+# ----------------------------------------------------------------------
+# summarise
+# ----------------------------------------------------------------------
+
+def read_events(paths: Iterable[str]) -> Iterable[Dict[str, Any]]:
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def summarise(events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    sessions = set()
+    model_s: List[float] = []
+    tokens: Dict[str, int] = defaultdict(int)
+    tools: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"calls": 0, "cached": 0, "errors": 0, "elapsed": []})
+    turns = 0
+    for event in events:
+        sessions.add(event.get("session"))
+        if event.get("event") != "turn":
+            continue
+        turns += 1
+        if event.get("model_s") is not None:
+            model_s.append(event["model_s"])
+        for key, value in (event.get("usage") or {}).items():
+            tokens[key] += value
+        for call in event.get("tools") or []:
+            t = tools[call["name"]]
+            t["calls"] += 1
+            t["cached"] += bool(call.get("cached"))
+            t["errors"] += call.get("status") == "error"
+            t["elapsed"].append(call.get("elapsed_s") or 0.0)
+    sessions.discard(None)
+    model_s.sort()
+    for t in tools.values():
+        t["elapsed"].sort()
+    return {
+        "sessions": len(sessions),
+        "turns": turns,
+        "turns_per_session": round(turns / len(sessions), 2) if sessions else 0,
+        "model_s": {"p50": round(quantile(model_s, 0.5), 3), "p95": round(quantile(model_s, 0.95), 3),
+                    "total": round(sum(model_s), 3)},
+        "tokens": dict(tokens),
+        "tools": {name: {"calls": t["calls"], "cache_hit_rate": round(t["cached"] / t["calls"], 3),
+                         "errors": t["errors"], "p50_s": round(quantile(t["elapsed"], 0.5), 4),
+                         "p95_s": round(quantile(t["elapsed"], 0.95), 4),
+                         "total_s": round(sum(t["elapsed"]), 3)}
+                  for name, t in sorted(tools.items())},
+    }
+
+
+def _print_summary(summary: Dict[str, Any]) -> None:
+    print(f"sessions: {summary['sessions']}  turns: {summary['turns']} "
+          f"({summary['turns_per_session']} per session)")
+    m = summary["model_s"]
+    print(f"model latency: p50 {m['p50']:.3f}s  p95 {m['p95']:.3f}s  total {m['total']:.1f}s")
+    if summary["tokens"]:
+        print("tokens: " + ", ".join(f"{k.replace('_token_count', '')} {v}" for k, v in summary["tokens"].items()))
+    if summary["tools"]:
+        print(f"{'tool':<18}{'calls':>7}{'cached':>8}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'total s':>9}")
+        for name, t in summary["tools"].items():
+            print(f"{name:<18}{t['calls']:>7}{t['cache_hit_rate']:>8.0%}{t['errors']:>8}"
+                  f"{t['p50_s'] * 1e3:>9.1f}{t['p95_s'] * 1e3:>9.1f}{t['total_s']:>9.2f}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m functions.session_log")
+    parser.add_argument("command", choices=["summarise"])
+    parser.add_argument("paths", nargs="*", help=f"log files (default: {LOG_PATH} and its rotations)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    opts = parser.parse_args(argv)
+    paths = opts.paths or glob.glob(LOG_PATH + ".*") + [LOG_PATH]
+    paths = [p for p in paths if os.path.isfile(p)]
+    if not paths:
+        print("no log files found")
+        return 1
+    summary = summarise(read_events(paths))
+    if opts.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        _print_summary(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# functions/session_output.py
+"""Per-session stdout for sessions sharing one process (--serve, --batch).
+
+The agent reports progress with plain print(). install() swaps sys.stdout
+for a router that sends each write to the stream bound to the current
+context by redirect(), or to the real stdout when none is bound. Tool
+threads started by TurnDispatcher inherit the context, so their output
+lands with the session that asked for it.
+"""
+import contextlib
+import contextvars
+import io
+import sys
+import threading
+from typing import Iterator, Optional, TextIO
+
+_target: "contextvars.ContextVar[Optional[TextIO]]" = contextvars.ContextVar("session_output", default=None)
+_install_lock = threading.Lock()
+
+
+class _Router(io.TextIOBase):
+    def __init__(self, default: TextIO) -> None:
+        self.default = default
+
+    def _stream(self) -> TextIO:
+        return _target.get() or self.default
+
+    def write(self, s: str) -> int:
+        return self._stream().write(s)
+
+    def flush(self) -> None:
+        self._stream().flush()
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return self._stream().isatty()
+
+
+def install() -> None:
+    with _install_lock:
+        if not isinstance(sys.stdout, _Router):
+            sys.stdout = _Router(sys.stdout)
+
+
+@contextlib.contextmanager
+def redirect(stream: TextIO) -> Iterator[TextIO]:
+    """Send this context's print() output to `stream`."""
+    install()
+    token = _target.set(stream)
+    try:
+        yield stream
+    finally:
+        _target.reset(token)
@@ -0,0 +1,64 @@
+# functions/termination.py
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# A verifier looks at one tool payload and returns True if it shows the task
+# is done, False if it shows the task is not done (a failure, or a change
+# made after any earlier check), or None if it says nothing either way.
+Verifier = Callable[[Dict[str, Any]], Optional[bool]]
+
+
+def default_verifier(payload: Dict[str, Any]) -> Optional[bool]:
+    status, kind = payload.get("status"), payload.get("kind")
+    art = payload.get("artifacts") or {}
+    if kind == "run":
+        if status != "ok" or not isinstance(art.get("returncode"), int):
+            return False
+        tests = art.get("tests")
+        return art["returncode"] == 0 and (tests is None or bool(tests.get("ok")))
+    if kind == "test":
+        return bool(art.get("passed"))
+    if status == "error":
+        return False
+    if kind == "write" and status == "ok":
+        return False  # the workspace changed after whatever was checked before
+    return None
+
+
+def tests_verifier(payload: Dict[str, Any]) -> Optional[bool]:
+    """Stricter: only a run whose output has a passing test summary counts."""
+    verdict = default_verifier(payload)
+    if payload.get("kind") == "run" and verdict and (payload.get("artifacts") or {}).get("tests") is None:
+        return None  # a plain script exiting 0 proves nothing here
+    return verdict
+
+
+@dataclass
+class TerminationPolicy:
+    """Decides after each tool turn whether another model round trip is needed.
+
+    Every payload of the turn is checked in call order and the last verdict
+    wins, so a passing run followed by a write keeps going, while a write
+    followed by a passing run stops immediately instead of asking the model
+    to confirm what the tools already showed.
+    """
+
+    verifiers: List[Verifier] = field(default_factory=lambda: [default_verifier])
+
+    def verdict(self, payload: Dict[str, Any]) -> Optional[bool]:
+        votes = [v(payload) for v in self.verifiers]
+        if False in votes:
+            return False
+        return True if True in votes else None
+
+    def deciding(self, payloads: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The payload that shows the task is done, or None to keep going."""
+        done, decided = None, None
+        for payload in payloads:
+            verdict = self.verdict(payload or {})
+            if verdict is not None:
+                done, decided = verdict, payload or {}
+        return decided if done else None
+
+    def should_continue(self, payloads: List[Dict[str, Any]]) -> bool:
+        return self.deciding(payloads) is None
@@ -0,0 +1,56 @@
+# functions/test_summary.py
+import re
+from typing import Any, Dict, Optional
+
+# unittest: "Ran 9 tests in 0.001s" ... "OK (skipped=1)" / "FAILED (failures=1, errors=2)"
+_UNITTEST_RAN = re.compile(r"^Ran (\d+) tests? in [\d.]+s$", re.MULTILINE)
+_UNITTEST_RESULT = re.compile(r"^(OK|FAILED)(?: \(([^)]*)\))?\s*$", re.MULTILINE)
+
+# pytest: "==== 3 passed, 1 failed, 2 skipped in 0.12s ====" (or the bare -q form)
+_PYTEST_LINE = re.compile(r"^=*\s*((?:\d+ \w+,?\s*)+) in [\d.]+s\b.*$", re.MULTILINE)
+_PYTEST_COUNT = re.compile(r"(\d+) (\w+)")
+_PYTEST_KEYS = {"passed": "passed", "failed": "failed", "error": "errors", "errors": "errors",
+                "skipped": "skipped", "xfailed": "skipped", "xpassed": "passed"}
+
+
+def parse_test_summary(output: str) -> Optional[Dict[str, Any]]:
+    """Pass/fail counts from the last unittest or pytest summary in `output`."""
+    summary = _parse_pytest(output) or _parse_unittest(output)
+    if summary is not None:
+        summary["total"] = summary["passed"] + summary["failed"] + summary["errors"] + summary["skipped"]
+        summary["ok"] = summary["failed"] == 0 and summary["errors"] == 0 and summary["total"] > 0
+    return summary
+
+
+def _parse_unittest(output: str) -> Optional[Dict[str, Any]]:
+    ran = list(_UNITTEST_RAN.finditer(output))
+    if not ran:
+        return None
+    last = ran[-1]
+    result = _UNITTEST_RESULT.search(output, last.end())
+    counts = {}
+    if result and result.group(2):
+        for item in result.group(2).split(","):
+            key, _, value = item.strip().partition("=")
+            if value.isdigit():
+                counts[key] = int(value)
+    failed = counts.get("failures", 0) + counts.get("unexpected_successes", 0)
+    errors = counts.get("errors", 0)
+    if result is None:
+        errors = errors or 1  # interrupted before the verdict line
+    skipped = counts.get("skipped", 0) + counts.get("expected_failures", 0)
+    passed = max(int(last.group(1)) - failed - errors - skipped, 0)
+    return {"framework": "unittest", "passed": passed, "failed": failed, "errors": errors,
+            "skipped": skipped}
+
+
+def _parse_pytest(output: str) -> Optional[Dict[str, Any]]:
+    lines = list(_PYTEST_LINE.finditer(output))
+    if not lines:
+        return None
+    summary = {"framework": "pytest", "passed": 0, "failed": 0, "errors": 0, "skipped": 0}
+    for count, word in _PYTEST_COUNT.findall(lines[-1].group(1)):
+        key = _PYTEST_KEYS.get(word)
+        if key:
+            summary[key] += int(count)
+    return summary
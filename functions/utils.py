@@ -1,7 +1,18 @@
 # functions/utils.py
+import hashlib
 import json
-from typing import Any, Dict
+import os
+import stat
+import tempfile
+from typing import Any, Dict, Optional
 
+from functions.profiler import profiler
+
+# read once: mkstemp creates files 0600, new files should get the usual mode
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+@profiler.timed("normalize_args")
 def normalize_args(arg: Any) -> Dict[str, Any]:
     if isinstance(arg, dict):
         return arg
@@ -18,4 +29,48 @@ def normalize_args(arg: Any) -> Dict[str, Any]:
             return val if isinstance(val, dict) else {}
         except json.JSONDecodeError:
             return {}
-    return {}
\ No newline at end of file
+    return {}
+
+def file_digest(path: str) -> Optional[str]:
+    """sha256 of a file's bytes, read in chunks; None if it can't be read."""
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.hexdigest()
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Replace `path` with `data` so readers see either the old or the new file.
+
+    The bytes go to a temp file in the same directory, are fsynced, and the
+    temp file is renamed over `path`; the existing file's mode is kept.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
@@ -1,7 +1,12 @@
 # functions/write_file_content.py
+import functools
+import hashlib
 from pathlib import Path
-from google.genai import types
+from functions.backups import get_backup_store
+from functions.utils import atomic_write, file_digest
+from functions.registry import WRITE, tool
 
+@tool(WRITE, schema=lambda: schema_write_file())
 def write_file(working_directory: str, file_path: str, content: str):
     sandbox = Path(working_directory).resolve()
     full_path = (sandbox / file_path).resolve()
@@ -16,25 +21,26 @@ def write_file(working_directory: str, file_path: str, content: str):
             "details": f'Cannot write outside working dir: "{file_path}"',
         }
 
-    # idempotence check
-    existing = None
-    if full_path.exists():
-        try:
-            existing = full_path.read_text(encoding="utf-8")
-        except Exception:
-            existing = None
+    return commit_write(full_path, file_path, content.encode("utf-8"), f'wrote "{file_path}"')
 
-    if existing is not None and existing == content:
+
+def commit_write(full_path: Path, file_path: str, data: bytes, details: str, artifacts=None):
+    """Back up and atomically replace `full_path` with `data` unless it already matches."""
+    if full_path.is_dir():
+        return {"status": "error", "kind": "write", "details": f'"{file_path}" is a directory'}
+
+    # idempotence check: sizes first, hash only when they match
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        existing_size = full_path.stat().st_size
+    except FileNotFoundError:
+        existing_size = None
+    if existing_size == len(data) and file_digest(str(full_path)) == digest:
         return {"status": "noop", "kind": "write", "details": "already up to date"}
 
     # backup after validations
-    if full_path.exists():
-        backup_path = full_path.with_suffix(full_path.suffix + ".bak")
-        counter = 1
-        while backup_path.exists():
-            backup_path = full_path.with_suffix(f"{full_path.suffix}.bak.{counter}")
-            counter += 1
-        full_path.rename(backup_path)
+    if existing_size is not None:
+        get_backup_store().save(str(full_path))
 
     parent_dir = full_path.parent
     try:
@@ -43,35 +49,40 @@ def write_file(working_directory: str, file_path: str, content: str):
         return {"status": "error", "kind": "write", "details": f"mkdir failed: {e}"}
 
     try:
-        bytes_written = len(content)
-        full_path.write_text(content, encoding="utf-8")
+        atomic_write(str(full_path), data)
     except OSError as e:
         return {"status": "error", "kind": "write", "details": f"write failed: {e}"}
 
     return {
         "status": "ok",
         "kind": "write",
-        "details": f'wrote "{file_path}"',
-        "artifacts": {"filepath": str(full_path), "bytes": bytes_written},
+        "details": details,
+        "artifacts": {"filepath": str(full_path), "bytes": len(data), "sha256": digest, **(artifacts or {})},
     }
 
-schema_write_file = types.FunctionDeclaration(
-    name="write_file",
-    description="Writes content to a file within the working directory. Creates the file if it doesn't exist.",
-    parameters=types.Schema(
-        type=types.Type.OBJECT,
-        properties={
-            "file_path": types.Schema(
-                type=types.Type.STRING,
-                description="Path to the file to write relative to the working directory.",
-            ),
-            "content": types.Schema(
-                type=types.Type.STRING,
-                description="The text that will be written to the file.",
-            ),
-        },
-        required=["file_path", "content"],
-    ),
-)
+@functools.cache
+def schema_write_file():
+    from google.genai import types
+    return types.FunctionDeclaration(
+        name="write_file",
+        description=(
+            "Writes content to a file within the working directory. Creates the file if it doesn't exist. "
+            "To change part of an existing file, use apply_patch instead of resending the whole file."
+        ),
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                "file_path": types.Schema(
+                    type=types.Type.STRING,
+                    description="Path to the file to write relative to the working directory.",
+                ),
+                "content": types.Schema(
+                    type=types.Type.STRING,
+                    description="The text that will be written to the file.",
+                ),
+            },
+            required=["file_path", "content"],
+        ),
+    )
 
 
@@ -1,25 +1,86 @@
 # main.py
+import argparse
+import contextvars
+import functools
 import os
 import sys
-from dotenv import load_dotenv
-from google import genai
-from google.genai import types
-from call_function import call_function, available_functions, arg_whitelists
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from call_function import announce, available_functions, response_part, unknown_function
 from prompts import SYSTEM_PROMPT
-from config import MAX_ITERATIONS, GEMINI_MODEL, LOG_PATH, WORKING_DIRECTORY
-os.makedirs(os.path.dirname(LOG_PATH) or ".", exist_ok=True)
+from config import (MAX_ITERATIONS, GEMINI_MODEL, WORKING_DIRECTORY, TOOL_WORKERS, TOOL_CACHE_DIR, REPLAY_DIR,
+                    SESSION_DEADLINE_S, SERVER_MAX_SESSIONS, SERVER_SOCKET, BATCH_CONCURRENCY, STOP_REPORT_LINES)
 from functions.cache import ToolCache
+from functions.context import compact_messages, part_chars, request_chars
+from functions.disk_cache import DiskCache
+from functions.profiler import profiler
+from functions.replay import ReplayClient, ReplayStore
+from functions.resources import RunStats, run_stats
+from functions.run_cache import run_cache
+from functions.scheduler import ScheduledClient
+from functions.session_log import JsonlLogger, session_id, usage_counts
+from functions.dispatch import ToolResult, TurnDispatcher
+from functions.registry import TOOLS, WRITE
+from functions.termination import TerminationPolicy, default_verifier, tests_verifier
 from functions.utils import normalize_args
 
 
 
 tool_cache = ToolCache()
+conversation_log = JsonlLogger()
 
-CACHEABLE = {"get_files_info", "get_file_content"}
+# what counts as "done" for --until; "answer" waits for the model to stop calling tools
+VERIFIERS = {"run": [default_verifier], "tests": [tests_verifier], "answer": []}
+termination_policy = TerminationPolicy()
+
+@dataclass
+class Session:
+    """Settings and running totals of one conversation. Several can run at
+    once in one process (--serve), so the loop reads them from the context."""
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    until: str = "run"
+    max_iterations: int = MAX_ITERATIONS
+    tool_workers: int = TOOL_WORKERS
+    tokens: Dict[str, int] = field(default_factory=dict)
+    tool_calls: int = 0
+    error: Optional[str] = None
+    stop_report: Optional[str] = None  # what ended the session when a tool result did
+    cached_calls: int = 0
+    runs: RunStats = field(default_factory=RunStats)  # this session's scripts only
+
+    def __post_init__(self):
+        self.policy = TerminationPolicy(VERIFIERS[self.until])
+
+    def note(self, record):
+        """Fold a finished turn's log record into the totals."""
+        for key, value in (record.get("usage") or {}).items():
+            self.tokens[key] = self.tokens.get(key, 0) + value
+        self.tool_calls += len(record.get("calls") or [])
+        for tool in record.get("tools") or []:
+            self.cached_calls += bool(tool.get("cached"))
+            payload = tool.get("payload") or {}
+            artifacts = payload.get("artifacts") or {}
+            if payload.get("kind") == "run" and artifacts.get("resources") and not artifacts.get("cached"):
+                self.runs.record(artifacts["resources"])
+        if record.get("error"):
+            self.error = record["error"]
+
+current_session: "contextvars.ContextVar[Optional[Session]]" = contextvars.ContextVar("session", default=None)
+
+def _session() -> Session:
+    # callers that drive generate_content directly get the process defaults
+    session = current_session.get()
+    if session is None:
+        session = Session(id=conversation_log.session)
+        session.policy = termination_policy
+    return session
 # ----------------------------------------------------------------------
 # 1️⃣ Helper utilities
 # ----------------------------------------------------------------------
 def load_api_key() -> str:
+    from dotenv import load_dotenv
     load_dotenv()
     key = os.getenv("GEMINI_API_KEY")
     if not key:
@@ -31,69 +92,319 @@ def print_verbose(msg: str, verbose: bool, *args) -> None:
     if verbose:
         print(msg.format(*args))
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py", add_help=False)
+    parser.add_argument("prompt", nargs="*")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--cache-dir", default=TOOL_CACHE_DIR,
+                        help="directory for the persistent tool cache")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="keep tool results in memory only for this run")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream responses and start tools as their calls arrive")
+    parser.add_argument("--until", choices=sorted(VERIFIERS),
+                        help="stop once a run succeeds, once tests pass, or only when the model answers")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each phase and print a latency breakdown at exit")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="also write the spans: Chrome trace if FILE ends in .json, else Prometheus text")
+    parser.add_argument("--record", action="store_true",
+                        help="save every model response under --replay-dir")
+    parser.add_argument("--replay", action="store_true",
+                        help="answer requests seen before from --replay-dir instead of the API")
+    parser.add_argument("--replay-dir", default=REPLAY_DIR)
+    parser.add_argument("--deadline", type=float, default=SESSION_DEADLINE_S, metavar="SECONDS",
+                        help="start no model request or retry after this long")
+    parser.add_argument("--max-iterations", type=int, metavar="N",
+                        help="model turns per session (with --serve: the most a client may ask for)")
+    parser.add_argument("--tool-workers", type=int, metavar="N",
+                        help="parallel tool calls per turn (with --serve: the most a client may ask for)")
+    parser.add_argument("--serve", action="store_true",
+                        help="keep running and serve prompts from --connect over a Unix socket")
+    parser.add_argument("--connect", action="store_true",
+                        help="send the prompt to a running --serve process")
+    parser.add_argument("--socket", default=SERVER_SOCKET)
+    parser.add_argument("--max-sessions", type=int, default=SERVER_MAX_SESSIONS, metavar="N",
+                        help="sessions a --serve process runs at once")
+    parser.add_argument("--batch", metavar="PROMPTS.jsonl",
+                        help="run every prompt in the file, several at once, resuming after a crash")
+    parser.add_argument("--batch-out", metavar="FILE",
+                        help="results of --batch, one JSON line per prompt (default: PROMPTS.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, metavar="N",
+                        help="sessions --batch runs at once")
+    options = parser.parse_args(argv)
+    if not options.connect:
+        # --connect sends only what was given, so the server's own settings apply
+        for name, default in (("until", "run"), ("max_iterations", MAX_ITERATIONS),
+                              ("tool_workers", TOOL_WORKERS)):
+            if getattr(options, name) is None:
+                setattr(options, name, default)
+    return options
+
 # ----------------------------------------------------------------------
 # 2️⃣ Main loop
 # ----------------------------------------------------------------------
 def main() -> None:
-    verbose = "--verbose" in sys.argv
-    user_args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = parse_args(sys.argv[1:])
+    if options.connect:
+        from functions.agent_client import connect
+        sys.exit(connect(options))
+    if options.serve:
+        from server import serve
+        setup(options)
+        serve(options)
+        return
+    if options.batch:
+        from batch import run_batch
+        setup(options)
+        code = run_batch(options)
+        finish(options)
+        sys.exit(code)
 
+    user_args = options.prompt
     if not user_args:
         print("DevDevBot Code Assistant:")
         print('\nUsage: python main.py "your prompt here"')
         print('Example: python main.py "How do I build a calculator app?"\n')
         sys.exit(1)
 
-    api_key = load_api_key()
-    client = genai.Client(api_key=api_key)
-    
-    user_prompt = " ".join(user_args)
-    messages = [types.Content(role="user", parts=[types.Part(text=user_prompt)])]
+    setup(options)
+    session = Session(id=conversation_log.session, until=options.until,
+                      max_iterations=options.max_iterations, tool_workers=options.tool_workers)
+    run_session(make_client(options), " ".join(user_args), session,
+                stream=options.stream, verbose=options.verbose)
+    finish(options)
 
-    turn = 0
-    while turn < MAX_ITERATIONS:
-        turn += 1
-        continue_loop = generate_content(client, messages, user_prompt, verbose)
-        if not continue_loop:  # no more turns
-            break
+def finish(options) -> None:
+    """Process-wide totals, then flush the log; sessions report their own."""
+    print_verbose("Tool cache: {}", options.verbose, tool_cache.stats())
+    print_verbose("All runs: {}", options.verbose, run_stats.stats())
+    conversation_log.log({"event": "process_end", "tool_cache": tool_cache.stats(), "runs": run_stats.stats()})
+    conversation_log.close()
+    if profiler.enabled:
+        profiler.print_report()
+        if options.profile_out:
+            profiler.write(options.profile_out)
+            print(f"Profile written to {options.profile_out}")
 
-    print(f"Finished after {turn} turn(s).")
+def setup(options) -> None:
+    """Process-wide state shared by every session."""
+    termination_policy.verifiers = VERIFIERS[options.until]
+    if options.profile or options.profile_out:
+        profiler.enable()
+    if not options.no_cache:
+        tool_cache.store = DiskCache(options.cache_dir)
 
-def default_verifier(payload) -> bool:
-    if payload.get("kind") == "run":
-        art = payload.get("artifacts", {})
-        return isinstance(art.get("returncode"), int) and art["returncode"] == 0
-    if payload.get("kind") == "test":
-        return bool(payload.get("artifacts", {}).get("passed"))
-    return False
+def make_client(options, api_client=None):
+    """The client for one session: rate limits and retries around the API
+    (or `api_client`, shared by --serve), then --record/--replay on top."""
+    client = None
+    if _reaches_api(options):
+        client = ScheduledClient(api_client or create_api_client(), deadline_s=options.deadline)
+    if options.record or options.replay:  # recorded answers skip the rate limiter
+        client = ReplayClient(client, ReplayStore(options.replay_dir),
+                              record=options.record, replay=options.replay)
+    return client
+
+def shared_api_client(options):
+    """The API client --serve and --batch share across their sessions, or
+    None when they only replay."""
+    return create_api_client() if _reaches_api(options) else None
+
+def _reaches_api(options):
+    # replaying alone never reaches the API, so it needs no key
+    return options.record or not options.replay
+
+def create_api_client():
+    # google.genai takes most of a second to import; only pay for it when
+    # a session is about to talk to the API
+    from google import genai
+    return genai.Client(api_key=load_api_key())
 
-def _append_assistant_text(parts):
-    lines = []
-    for p in parts:
-        if hasattr(p, "text") and p.text:
-            lines.append(p.text)
-        # optionally serialize function_call objects
-        if hasattr(p, "function_call") and p.function_call:
-            fc = p.function_call
-            lines.append(f"[FUNCTION_CALL] {fc.name}: {fc.args}")
-    if lines:
-        with open(LOG_PATH, "a", encoding="utf-8") as f:
-            f.write("\n".join(lines) + "\n\n")
+def _client_stats(client):
+    replay = client if isinstance(client, ReplayClient) else None
+    api = replay.client if replay else client
+    return {"api": api.stats() if api is not None else None,
+            "replay": replay.stats() if replay else None}
+
+def run_session(client, user_prompt, session, stream=False, verbose=False):
+    """Run one conversation to the end; returns its summary."""
+    from google.genai import types
+    session_token = current_session.set(session)
+    id_token = session_id.set(session.id)
+    try:
+        messages = [types.Content(role="user", parts=[types.Part(text=user_prompt)])]
+        started = time.perf_counter()
+        conversation_log.log({"event": "session_start", "prompt": user_prompt, "model": GEMINI_MODEL,
+                              "stream": stream, "until": session.until,
+                              "max_iterations": session.max_iterations})
+        if stream:
+            import asyncio
+            turn = asyncio.run(run_streaming(client, messages, user_prompt, verbose))
+        else:
+            turn = 0
+            while turn < session.max_iterations:
+                turn += 1
+                continue_loop = generate_content(client, messages, user_prompt, verbose)
+                if not continue_loop:  # no more turns
+                    break
+
+        elapsed = time.perf_counter() - started
+        stats = _client_stats(client)
+        print(f"Finished after {turn} turn(s).")
+        print_verbose("Tool calls: {} ({} from cache)", verbose, session.tool_calls, session.cached_calls)
+        print_verbose("Runs: {}", verbose, session.runs.stats())
+        for name, value in stats.items():
+            if value is not None:
+                print_verbose({"api": "API", "replay": "Replay"}[name] + ": {}", verbose, value)
+        conversation_log.log({"event": "session_end", "turns": turn, "elapsed_s": round(elapsed, 3),
+                              "tool_calls": session.tool_calls, "cached_calls": session.cached_calls,
+                              "runs": session.runs.stats(), **stats})
+        return {"session": session.id, "turns": turn, "text": _final_text(messages) or session.stop_report or "",
+                "tool_calls": session.tool_calls, "elapsed_s": round(elapsed, 3),
+                "tokens": dict(session.tokens), "error": session.error}
+    finally:
+        session_id.reset(id_token)
+        current_session.reset(session_token)
+
+def _final_text(messages):
+    for m in reversed(messages):
+        if m.role == "assistant":
+            text = "".join(p.text for p in m.parts or [] if getattr(p, "text", None))
+            if text:
+                return text.strip()
+    return ""
+
+def _turn_record(messages):
+    """The log event for the turn about to be requested; filled in as it runs."""
+    turn = 1 + sum(1 for m in messages if m.role == "assistant")
+    return {"event": "turn", "turn": turn}
+
+def _record_response(record, parts, usage_metadata):
+    record["response_chars"] = sum(part_chars(p) for p in parts)
+    record["text"] = "".join(p.text for p in parts if getattr(p, "text", None))
+    record["calls"] = [{"name": p.function_call.name, "args": p.function_call.args}
+                       for p in parts if getattr(p, "function_call", None)]
+    record["usage"] = usage_counts(usage_metadata)
+
+def run_tool_call(fc, supplied, verbose) -> ToolResult:
+    name = fc.name
+    tool = TOOLS.get(name)
+    if tool is None:
+        announce(fc, verbose)
+        payload = unknown_function(name)
+        return ToolResult(name, response_part(name, payload), payload)
+    args = tool.bind(supplied, WORKING_DIRECTORY)
+
+    # try cache for read/list
+    if tool.cacheable:
+        cached_part, cached_payload = tool_cache.get(name, args)
+        if cached_part:
+            return ToolResult(name, cached_part, cached_payload, cached=True)
+
+    # execute tool
+    announce(fc, verbose)
+    with profiler.span(f"tool.{name}"):
+        payload = tool.run(args)
+    resp_part = response_part(name, payload)
+    # store in cache if cacheable
+    if tool.cacheable:
+        tool_cache.set(name, args, resp_part, payload)
+    # drop anything the write made stale before the next read can see it
+    elif tool.access == WRITE and "file_path" in args:
+        tool_cache.invalidate(WORKING_DIRECTORY, args["file_path"])
+        run_cache.invalidate(os.path.join(WORKING_DIRECTORY, args["file_path"]))
+    return ToolResult(name, resp_part, payload)
 
 # 3️⃣ Interaction with Gemini
+@functools.cache
+def _request_config():
+    from google.genai import types
+    return types.GenerateContentConfig(
+        tools=[available_functions()],
+        system_instruction=SYSTEM_PROMPT,
+    )
+
+def _compacted(messages, verbose, record):
+    with profiler.span("compact"):
+        contents = compact_messages(messages)
+    record["request_chars"] = request_chars(messages)
+    record["sent_chars"] = request_chars(contents)
+    print_verbose("Request: {} chars, {} after compaction", verbose,
+                  record["request_chars"], record["sent_chars"])
+    return contents
+
+def submit_tool_call(dispatcher, fc, verbose):
+    supplied = normalize_args(fc.args)
+    return dispatcher.submit(fc.name, supplied,
+                             lambda: run_tool_call(fc, supplied, verbose))
+
+def finish_tool_turn(messages, results, tools_elapsed, verbose, record) -> bool:
+    from google.genai import types
+    record["tools_wall_s"] = round(tools_elapsed, 4)
+    record["tools"] = [{"name": r.name, "elapsed_s": round(r.elapsed, 4), "cached": r.cached,
+                        "status": r.payload.get("status"), "kind": r.payload.get("kind"),
+                        "payload_chars": part_chars(r.part) if r.part else 0, "payload": r.payload}
+                       for r in results]
+    if any(r.part is None for r in results):
+        print("Malformed tool response")
+        return False
+
+    tool_parts = [r.part for r in results]
+    if verbose:
+        for r in results:
+            print("TOOL PAYLOAD:", r.payload)
+        print(f"Tool time: {tools_elapsed:.3f}s wall, "
+              f"{sum(r.elapsed for r in results):.3f}s across {len(results)} call(s)")
+
+    # respond with exactly one tool message containing all responses
+    messages.append(types.Content(role="tool", parts=tool_parts))
+
+    # stop as soon as the turn's own results show the task is done
+    done_by = _session().policy.deciding([r.payload for r in results])
+    if done_by is None:
+        return True
+    report = _stop_report(done_by)
+    print(report)
+    _session().stop_report = report
+    return False
+
+def _stop_report(payload):
+    """What the user sees when a tool result, not the model, ends the session."""
+    art = payload.get("artifacts") or {}
+    subject = art.get("file_path") or payload.get("kind") or "tool"
+    lines = [f"Done: {subject} {payload.get('details', '')}".rstrip()]
+    output = "\n".join(s.rstrip() for s in (art.get("stdout"), art.get("stderr")) if s and s.strip())
+    tail = [line for line in output.splitlines() if line.strip()][-STOP_REPORT_LINES:]
+    lines += ["  " + line for line in tail]
+    return "\n".join(lines)
+
 def generate_content(client, messages, user_prompt, verbose) -> bool:
+    record = _turn_record(messages)
+    try:
+        record["continue"] = _generate_turn(client, messages, verbose, record)
+    finally:
+        _session().note(record)
+        conversation_log.log(record)  # queued; written off the critical path
+    return record["continue"]
+
+def _generate_turn(client, messages, verbose, record) -> bool:
+    from google.genai import types
+    started = time.perf_counter()
+    contents = _compacted(messages, verbose, record)
     try:
-        response = client.models.generate_content(
-            model=GEMINI_MODEL,
-            contents=messages,
-            config=types.GenerateContentConfig(
-                tools=[available_functions],
-                system_instruction=SYSTEM_PROMPT,
-            ),
-        )
+        with profiler.span("model"):
+            response = client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=contents,
+                config=_request_config(),
+            )
     except Exception as exc:
+        record["error"] = str(exc)
         print(f"Gemini API error: {exc}")
         return False
+    finally:
+        record["model_s"] = round(time.perf_counter() - started, 4)
 
     if not response.candidates or not getattr(response.candidates[0], "content", None):
         if verbose:
@@ -106,64 +417,117 @@ def generate_content(client, messages, user_prompt, verbose) -> bool:
     # Append assistant once
     assistant_msg = types.Content(role="assistant", parts=parts)
     messages.append(assistant_msg)
-    _append_assistant_text(parts)
+    _record_response(record, parts, getattr(response, "usage_metadata", None))
 
     calls = [p.function_call for p in parts if getattr(p, "function_call", None)]
     if calls:
-        tool_parts = []
-        last_payload = None
-
-        for fc in calls:
-            name = fc.name
-            supplied = normalize_args(fc.args)
-            supplied["working_directory"] = WORKING_DIRECTORY
-            filtered = {k: v for k, v in supplied.items() if k in arg_whitelists.get(name, set())}
-
-            # try cache for read/list
-            resp_part = None
-            payload = None
-            if name in CACHEABLE:
-                cached_part, cached_payload = tool_cache.get(name, filtered)
-                if cached_part:
-                    resp_part, payload = cached_part, cached_payload
-
-            if resp_part is None:
-                # execute tool
-                result_msg = call_function(fc, verbose=verbose)
-                resp_part = next((pt for pt in (getattr(result_msg, "parts", None) or [])
-                                if getattr(pt, "function_response", None)), None)
-                if not resp_part:
-                    print("Malformed tool response")
-                    return False
-                payload = getattr(resp_part.function_response, "response", {}) or {}
-                # store in cache if cacheable
-                if name in CACHEABLE:
-                    tool_cache.set(name, filtered, resp_part, payload)
-
-            tool_parts.append(resp_part)
-            last_payload = payload
-            if verbose:
-                print("TOOL PAYLOAD:", payload)
-
-        # respond with exactly one tool message containing all responses
-        messages.append(types.Content(role="tool", parts=tool_parts))
-
-        # termination logic
-        if last_payload:
-            status = last_payload.get("status")
-            kind = last_payload.get("kind")
-            if status == "error":
-                return True
-            if status == "noop" and kind == "write":
-                return True
-            if default_verifier(last_payload):
-                return False
-        return True
+        tools_started = time.perf_counter()
+        with TurnDispatcher(max_workers=_session().tool_workers) as dispatcher:
+            for fc in calls:
+                submit_tool_call(dispatcher, fc, verbose)
+            results = dispatcher.results()
+        tools_elapsed = time.perf_counter() - tools_started
+        return finish_tool_turn(messages, results, tools_elapsed, verbose, record)
     # No tool call
     first_text = next((p.text for p in parts if hasattr(p, "text") and p.text), None)
     if first_text:
         print(first_text.strip())
     return False
 
+# 4️⃣ Streaming variant (--stream)
+async def agenerate_content(client, messages, user_prompt, verbose) -> bool:
+    """Like generate_content, but prints text as it arrives and starts each
+    tool call as soon as its part has been received."""
+    record = _turn_record(messages)
+    try:
+        record["continue"] = await _agenerate_turn(client, messages, verbose, record)
+    finally:
+        _session().note(record)
+        conversation_log.log(record)
+    return record["continue"]
+
+async def _agenerate_turn(client, messages, verbose, record) -> bool:
+    import asyncio
+    from google.genai import types
+    started = time.perf_counter()
+    first_token = None
+    mid_line = False
+    parts = []
+    text = []
+    futures = []
+    tools_started = None
+    usage_metadata = None
+
+    def flush_text():
+        if text:
+            parts.append(types.Part(text="".join(text)))
+            text.clear()
+
+    with TurnDispatcher(max_workers=_session().tool_workers) as dispatcher:
+        try:
+            stream = await client.aio.models.generate_content_stream(
+                model=GEMINI_MODEL,
+                contents=_compacted(messages, verbose, record),
+                config=_request_config(),
+            )
+            async for chunk in stream:
+                # the running totals arrive with the chunks; keep the last
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                if not chunk.candidates or not getattr(chunk.candidates[0], "content", None):
+                    continue
+                for part in chunk.candidates[0].content.parts or []:
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                    if part.text:
+                        print(part.text, end="", flush=True)
+                        text.append(part.text)
+                        mid_line = True
+                        continue
+                    if mid_line:
+                        print()
+                        mid_line = False
+                    flush_text()
+                    parts.append(part)
+                    if part.function_call:
+                        if tools_started is None:
+                            tools_started = time.perf_counter()
+                        futures.append(submit_tool_call(dispatcher, part.function_call, verbose))
+        except Exception as exc:
+            record["error"] = str(exc)
+            print(f"Gemini API error: {exc}")
+            return False
+        finally:
+            if mid_line:
+                print()
+            record["model_s"] = round(time.perf_counter() - started, 4)
+            profiler.record("model.stream", started, record["model_s"])
+        flush_text()
+        model_elapsed = time.perf_counter() - started
+
+        results = list(await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
+
+    if first_token is not None:
+        record["first_token_s"] = round(first_token, 4)
+        print_verbose("Model: first token {:.3f}s, stream {:.3f}s, turn {:.3f}s", verbose,
+                      first_token, model_elapsed, time.perf_counter() - started)
+    if not parts:
+        print_verbose("Empty response", verbose)
+        return False
+
+    messages.append(types.Content(role="assistant", parts=parts))
+    _record_response(record, parts, usage_metadata)
+
+    if not results:
+        return False
+    return finish_tool_turn(messages, results, time.perf_counter() - tools_started, verbose, record)
+
+async def run_streaming(client, messages, user_prompt, verbose) -> int:
+    turn = 0
+    while turn < _session().max_iterations:
+        turn += 1
+        if not await agenerate_content(client, messages, user_prompt, verbose):
+            break
+    return turn
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -11,9 +11,11 @@ When a user asks a question or makes a request, make a function call plan. For e
 You can perform the following operations:
 
 - List files and directories
+- Search the code for text or a regular expression
 - Read file contents
 - Execute Python files with optional arguments
 - Write or overwrite files
+- Edit part of a file with a diff or search/replace edits
 
 All paths you provide should be relative to the working directory. You do not need to specify the working directory in your function calls as it is automatically injected for security.
 
@@ -0,0 +1,151 @@
+# server.py
+"""Long-lived agent process serving sessions over a Unix socket.
+
+    python main.py --serve                 # keep one warm process running
+    python main.py --connect "your prompt" # same output as python main.py
+
+The server imports everything once and shares the genai client, the tool
+cache, the run cache and the warm interpreter pool across sessions. Each
+connection is one session with its own messages, running on its own
+thread; at most --max-sessions run at once and later ones queue.
+
+Protocol: the client sends one JSON line {"prompt", "stream", "verbose",
+"until", "max_iterations", "tool_workers"}; the server answers with
+{"output": text} lines as the session prints, then {"result": {...}} (or
+{"error": message}). The client side is functions/agent_client.py.
+"""
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any, Callable, Dict
+
+from config import PYTHON_POOL
+from functions.python_pool import warm_up
+from functions.session_output import redirect
+from main import VERIFIERS, Session, finish, make_client, print_verbose, run_session, shared_api_client
+
+
+class _SocketOutput:
+    """File-like sink that forwards a session's prints to its client."""
+
+    def __init__(self, send: Callable[[Dict[str, Any]], None]) -> None:
+        self._send = send
+
+    def write(self, s: str) -> int:
+        if s:
+            self._send({"output": s})
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self) -> None:
+        super().setup()
+        self._lock = threading.Lock()  # tool threads print concurrently
+        self._closed = False
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self.wfile.write((json.dumps(message, default=str) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                self._closed = True  # client went away; let the session finish quietly
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+            prompt = request["prompt"]
+        except (ValueError, KeyError, TypeError):
+            self._send({"error": "expected one JSON line with a prompt"})
+            return
+        server: AgentServer = self.server  # type: ignore[assignment]
+        until = request.get("until") or server.options.until
+        if until not in VERIFIERS:
+            self._send({"error": f"unknown --until {until!r}"})
+            return
+        try:
+            max_iterations = _limit(request, "max_iterations", server.max_iterations)
+            tool_workers = _limit(request, "tool_workers", server.tool_workers)
+        except ValueError as exc:
+            self._send({"error": str(exc)})
+            return
+        session = Session(until=until, max_iterations=max_iterations, tool_workers=tool_workers)
+        with server.slots:
+            try:
+                with redirect(_SocketOutput(self._send)):
+                    result = run_session(make_client(server.options, server.api_client), prompt, session,
+                                         stream=bool(request.get("stream")), verbose=bool(request.get("verbose")))
+            except Exception as exc:
+                self._send({"error": f"session failed: {exc}"})
+                return
+        self._send({"result": result})
+
+
+def _limit(request: Dict[str, Any], key: str, ceiling: int) -> int:
+    """`request[key]` if given, else the server's own value; requests may
+    lower the server's limits, never raise them."""
+    if key not in request:
+        return ceiling
+    value = request[key]
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"{key} must be a positive integer, got {value!r}")
+    return min(value, ceiling)
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, options: Any, api_client: Any) -> None:
+        self.options = options
+        self.api_client = api_client
+        self.max_iterations = options.max_iterations
+        self.tool_workers = options.tool_workers
+        self.slots = threading.BoundedSemaphore(options.max_sessions)
+        super().__init__(path, _Handler)
+
+
+def _in_use(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(options: Any) -> None:
+    path = options.socket
+    if os.path.exists(path):
+        if _in_use(path):
+            print(f"An agent server is already listening on {path}")
+            sys.exit(1)
+        os.unlink(path)  # left over from a server that did not shut down cleanly
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    api_client = shared_api_client(options)
+    if PYTHON_POOL:
+        warm_up()
+    server = AgentServer(path, options, api_client)
+    os.chmod(path, 0o600)
+    print(f"Serving on {path}, up to {options.max_sessions} session(s) at once. Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        finish(options)
+        print_verbose("Stopped.", options.verbose)
@@ -0,0 +1,96 @@
+# test_apply_patch.py
+# Run from the project root: python -m unittest test_apply_patch
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from functions import backups
+from functions.apply_patch import PatchError, apply_edits, apply_patch, apply_unified_diff
+
+
+class TestUnifiedDiff(unittest.TestCase):
+    def test_crlf_file_keeps_crlf(self):
+        text = "a\r\nb\r\nc\r\n"
+        result, _ = apply_unified_diff(text, "@@ -2 +2 @@\n-b\n+B\n")
+        self.assertEqual(result, "a\r\nB\r\nc\r\n")
+
+    def test_mixed_endings_are_kept_per_line(self):
+        text = "a\r\nb\nc\r\nd\n"
+        result, _ = apply_unified_diff(text, "@@ -2,2 +2,2 @@\n b\n-c\n+C\n")
+        self.assertEqual(result, "a\r\nb\nC\nd\n")
+
+    def test_form_feed_is_not_a_line_break(self):
+        text = "one\n\x0c\ntwo\x0cthree\nfour\n"
+        result, _ = apply_unified_diff(text, "@@ -3,2 +3,2 @@\n two\x0cthree\n-four\n+FOUR\n")
+        self.assertEqual(result, "one\n\x0c\ntwo\x0cthree\nFOUR\n")
+
+    def test_insertion_hunk(self):
+        result, stats = apply_unified_diff("a\nb\n", "@@ -1,0 +2 @@\n+inserted\n")
+        self.assertEqual(result, "a\ninserted\nb\n")
+        self.assertEqual((stats["added"], stats["removed"]), (1, 0))
+
+    def test_insertion_at_top(self):
+        result, _ = apply_unified_diff("a\n", "@@ -0,0 +1 @@\n+first\n")
+        self.assertEqual(result, "first\na\n")
+
+    def test_missing_final_newline_is_kept(self):
+        result, _ = apply_unified_diff("a\nb", "@@ -2 +2 @@\n-b\n+B\n")
+        self.assertEqual(result, "a\nB")
+
+    def test_no_match(self):
+        with self.assertRaises(PatchError):
+            apply_unified_diff("a\nb\n", "@@ -1 +1 @@\n-zzz\n+y\n")
+
+
+class TestEdits(unittest.TestCase):
+    def test_crlf_search(self):
+        result, _ = apply_edits("a\r\nb\r\n", [{"search": "a\nb", "replace": "x\ny"}])
+        self.assertEqual(result, "x\r\ny\r\n")
+
+    def test_form_feed(self):
+        result, _ = apply_edits("a\x0cb\n", [{"search": "a\x0cb", "replace": "c\x0cd"}])
+        self.assertEqual(result, "c\x0cd\n")
+
+    def test_ambiguous_search(self):
+        with self.assertRaisesRegex(PatchError, "occurs 2 times"):
+            apply_edits("x = 1\nx = 1\n", [{"search": "x = 1", "replace": "x = 2"}])
+
+    def test_no_match(self):
+        with self.assertRaisesRegex(PatchError, "not found"):
+            apply_edits("x = 1\n", [{"search": "y = 1", "replace": "y = 2"}])
+
+
+class TestApplyPatchTool(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        store = backups.BackupStore(os.path.join(self.dir.name, ".devdevbot", "backups"))
+        patcher = mock.patch.object(backups, "_store", store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.dir.cleanup)
+
+    def write(self, data):
+        with open(os.path.join(self.dir.name, "f.txt"), "wb") as f:
+            f.write(data)
+
+    def read(self):
+        with open(os.path.join(self.dir.name, "f.txt"), "rb") as f:
+            return f.read()
+
+    def test_patch_mode_keeps_bytes_outside_the_hunk(self):
+        self.write(b"a\r\nb\n\x0c\nc\n")
+        payload = apply_patch(self.dir.name, "f.txt", patch="@@ -4 +4 @@\n-c\n+C\n")
+        self.assertEqual(payload["status"], "ok")
+        self.assertEqual(self.read(), b"a\r\nb\n\x0c\nC\n")
+
+    def test_edits_mode_reports_ambiguity_and_leaves_file(self):
+        self.write(b"x\nx\n")
+        payload = apply_patch(self.dir.name, "f.txt", edits=[{"search": "x", "replace": "y"}])
+        self.assertEqual(payload["status"], "error")
+        self.assertEqual(self.read(), b"x\nx\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# test_dispatch.py
+# Run from the project root: python -m unittest test_dispatch
+
+import threading
+import time
+import unittest
+
+# importing the tool modules registers their access levels
+import functions.get_file_content  # noqa: F401
+import functions.run_python  # noqa: F401
+import functions.write_file_content  # noqa: F401
+from functions.dispatch import ToolResult, TurnDispatcher, _conflicts
+from functions.registry import READ, RUN, WRITE
+
+
+class TestConflicts(unittest.TestCase):
+    def test_table(self):
+        cases = [
+            ((READ, "a"), (READ, "a"), False),
+            ((READ, "a"), (WRITE, "a"), True),
+            ((WRITE, "a"), (READ, "a"), True),
+            ((WRITE, "a"), (WRITE, "b"), False),
+            ((WRITE, "pkg"), (READ, "pkg/x.py"), True),
+            ((WRITE, "."), (WRITE, "b"), True),
+            ((READ, "a"), (RUN, "b.py"), True),
+            ((RUN, "b.py"), (READ, "a"), True),
+            ((RUN, "a.py"), (RUN, "b.py"), True),
+        ]
+        for earlier, later, expected in cases:
+            with self.subTest(earlier=earlier, later=later):
+                self.assertEqual(_conflicts(earlier, later), expected)
+
+
+class TestTurnDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.dispatcher = TurnDispatcher(max_workers=4)
+        self.addCleanup(self.dispatcher.close)
+
+    def step(self, tag, hold_s=0.0, barrier=None):
+        def fn():
+            self.events.append(("start", tag))
+            if barrier is not None:
+                barrier.wait(timeout=2)  # BrokenBarrierError if the calls were serialized
+            time.sleep(hold_s)
+            self.events.append(("end", tag))
+            return ToolResult(tag, None, {})
+        return fn
+
+    def submit(self, tool_name, path, fn):
+        arg = "directory" if tool_name == "get_files_info" else "file_path"
+        return self.dispatcher.submit(tool_name, {arg: path}, fn)
+
+    def assertOrdered(self, first, second):
+        self.assertLess(self.events.index(("end", first)), self.events.index(("start", second)))
+
+    def test_reads_overlap(self):
+        barrier = threading.Barrier(2)
+        self.submit("get_file_content", "a.py", self.step("a", barrier=barrier))
+        self.submit("get_file_content", "a.py", self.step("b", barrier=barrier))
+        self.assertEqual([r.name for r in self.dispatcher.results()], ["a", "b"])
+
+    def test_writes_to_other_paths_overlap(self):
+        barrier = threading.Barrier(2)
+        self.submit("write_file", "a.py", self.step("a", barrier=barrier))
+        self.submit("write_file", "b.py", self.step("b", barrier=barrier))
+        self.dispatcher.results()
+
+    def test_write_waits_for_read_of_same_path(self):
+        self.submit("get_file_content", "a.py", self.step("read", hold_s=0.2))
+        self.submit("write_file", "a.py", self.step("write"))
+        self.dispatcher.results()
+        self.assertOrdered("read", "write")
+
+    def test_run_waits_for_read_of_another_path(self):
+        self.submit("get_file_content", "notes.txt", self.step("read", hold_s=0.2))
+        self.submit("run_python_file", "main.py", self.step("run"))
+        self.dispatcher.results()
+        self.assertOrdered("read", "run")
+
+    def test_read_waits_for_earlier_run(self):
+        self.submit("run_python_file", "main.py", self.step("run", hold_s=0.2))
+        self.submit("get_file_content", "out.txt", self.step("read"))
+        self.dispatcher.results()
+        self.assertOrdered("run", "read")
+
+    def test_unknown_tool_is_ordered_like_a_run(self):
+        self.submit("get_file_content", "a.py", self.step("read", hold_s=0.2))
+        self.submit("no_such_tool", "b.py", self.step("unknown"))
+        self.dispatcher.results()
+        self.assertOrdered("read", "unknown")
+
+    def test_results_come_back_in_submission_order(self):
+        self.submit("get_file_content", "a.py", self.step("slow", hold_s=0.2))
+        self.submit("get_file_content", "b.py", self.step("fast"))
+        self.assertEqual([r.name for r in self.dispatcher.results()], ["slow", "fast"])
+        self.assertLess(self.events.index(("end", "fast")), self.events.index(("end", "slow")))
+
+
+if __name__ == "__main__":
+    unittest.main()
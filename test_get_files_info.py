@@ -0,0 +1,76 @@
+# test_get_files_info.py
+# Run from the project root: python -m unittest test_get_files_info
+
+import os
+import tempfile
+import unittest
+
+from functions.get_files_info import get_files_info
+
+
+class TestGetFilesInfo(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.write(".gitignore", "*.log\nbuild/\n!keep.log\n")
+        self.write("app.py", "")
+        self.write("debug.log", "")
+        self.write("keep.log", "")
+        self.write("build/out.txt", "")
+        self.write("pkg/.gitignore", "/local.txt\n")
+        self.write("pkg/local.txt", "")
+        self.write("pkg/mod.py", "")
+        self.write("pkg/trace.log", "")
+        self.write("pkg/sub/local.txt", "")
+
+    def write(self, rel, text):
+        full = os.path.join(self.dir.name, rel)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(text)
+
+    def paths(self, **kwargs):
+        payload = get_files_info(self.dir.name, recursive=True, **kwargs)
+        self.assertEqual(payload["status"], "ok", payload)
+        return [e["path"] for e in payload["artifacts"]["entries"]], payload["artifacts"].get("next_cursor")
+
+    def test_gitignore_rules(self):
+        paths, _ = self.paths()
+        self.assertEqual(paths, [".gitignore", "app.py", "keep.log", "pkg", "pkg/.gitignore",
+                                 "pkg/mod.py", "pkg/sub", "pkg/sub/local.txt"])
+
+    def test_parent_rules_apply_to_a_listed_subdirectory(self):
+        paths, _ = self.paths(directory="pkg")
+        self.assertEqual(paths, [".gitignore", "mod.py", "sub", "sub/local.txt"])
+
+    def test_respect_gitignore_off(self):
+        paths, _ = self.paths(respect_gitignore=False)
+        self.assertIn("debug.log", paths)
+        self.assertIn("build/out.txt", paths)
+        self.assertIn("pkg/local.txt", paths)
+
+    def test_pages_cover_the_listing_once(self):
+        everything, cursor = self.paths()
+        self.assertIsNone(cursor)
+        pages, cursor = [], None
+        while True:
+            page, cursor = self.paths(limit=3, cursor=cursor)
+            self.assertLessEqual(len(page), 3)
+            pages.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual(pages, everything)
+
+    def test_last_full_page_has_no_cursor(self):
+        everything, _ = self.paths()
+        _, cursor = self.paths(limit=len(everything))
+        self.assertIsNone(cursor)
+
+    def test_bad_cursor(self):
+        for cursor in ("-1", "abc"):
+            payload = get_files_info(self.dir.name, recursive=True, cursor=cursor)
+            self.assertEqual(payload["status"], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# test_run_python.py
+# Run from the project root: python -m unittest test_run_python
+
+import os
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+from unittest import mock
+
+from functions import run_python
+from functions.capture import BoundedCapture
+from functions.run_python import _run_captured, run_python_file
+
+
+class TestBoundedCapture(unittest.TestCase):
+    def test_keeps_head_and_tail(self):
+        capture = BoundedCapture(head_bytes=4, tail_bytes=4)
+        for chunk in (b"abc", b"defgh", b"ijkl"):
+            capture.write(chunk)
+        self.assertEqual((bytes(capture.head), bytes(capture.tail)), (b"abcd", b"ijkl"))
+        self.assertEqual(capture.dropped, 4)
+        self.assertEqual(capture.text(), "abcd\n[... 4 bytes dropped ...]\nijkl")
+
+    def test_short_stream_is_kept_whole(self):
+        capture = BoundedCapture(head_bytes=4, tail_bytes=4)
+        capture.write(b"abcdef")
+        self.assertEqual((capture.dropped, capture.text()), (0, "abcdef"))
+
+
+class TestRunCaptured(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def run_script(self, source, timeout, head_bytes=8192):
+        script = os.path.join(self.dir.name, "script.py")
+        with open(script, "w") as f:
+            f.write(textwrap.dedent(source))
+        out, err = BoundedCapture(head_bytes, 64), BoundedCapture(head_bytes, 64)
+        started = time.monotonic()
+        returncode, timed_out, _ = _run_captured([sys.executable, script], self.dir.name,
+                                                 timeout, out, err, None)
+        return returncode, timed_out, out, time.monotonic() - started
+
+    def test_closing_the_pipes_does_not_escape_the_timeout(self):
+        _, timed_out, _, elapsed = self.run_script("""
+            import os, time
+            os.close(1)
+            os.close(2)
+            time.sleep(30)
+        """, timeout=1)
+        self.assertTrue(timed_out)
+        self.assertLess(elapsed, 5)
+
+    def test_timeout_keeps_output_written_before_the_kill(self):
+        _, timed_out, out, elapsed = self.run_script("""
+            import time
+            print("started", flush=True)
+            time.sleep(30)
+        """, timeout=1)
+        self.assertTrue(timed_out)
+        self.assertEqual(out.text(), "started\n")
+        self.assertLess(elapsed, 5)
+
+    def test_child_holding_the_pipes_does_not_time_out_the_script(self):
+        returncode, timed_out, out, elapsed = self.run_script("""
+            import subprocess, sys, time
+            subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+            print("parent done", flush=True)
+        """, timeout=1)
+        self.assertEqual((returncode, timed_out), (0, False))
+        self.assertEqual(out.text(), "parent done\n")
+        self.assertLess(elapsed, 5)
+
+    def test_large_output_is_bounded(self):
+        returncode, timed_out, out, _ = self.run_script("""
+            for i in range(100000):
+                print(i)
+        """, timeout=10, head_bytes=16)
+        self.assertEqual((returncode, timed_out), (0, False))
+        self.assertTrue(out.text().startswith("0\n1\n2\n"))
+        self.assertTrue(out.text().endswith("99998\n99999\n"))
+        self.assertGreater(out.dropped, 0)
+
+
+class TestRunPythonFile(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        for name, value in (("PYTHON_POOL", False), ("RUN_CACHE", False),
+                            ("RUN_OUTPUT_LOG_DIR", None), ("RUN_TIMEOUT_S", 1)):
+            patcher = mock.patch.object(run_python, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_timeout_is_reported(self):
+        with open(os.path.join(self.dir.name, "slow.py"), "w") as f:
+            f.write("import os, time\nos.close(1)\nos.close(2)\ntime.sleep(30)\n")
+        payload = run_python_file(self.dir.name, "slow.py")
+        self.assertEqual(payload["status"], "error")
+        self.assertTrue(payload["details"].startswith("timed out after 1s"))
+        self.assertTrue(payload["artifacts"]["timed_out"])
+        self.assertIsNone(payload["artifacts"]["returncode"])
+
+
+if __name__ == "__main__":
+    unittest.main()
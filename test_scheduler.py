@@ -0,0 +1,65 @@
+# test_scheduler.py
+# Run from the project root: python -m unittest test_scheduler
+
+import unittest
+
+from google.genai import errors, types
+
+from benchmarks.fake_gemini import FakeClient, api_error, text
+from functions.scheduler import DeadlineExceeded, RateLimiter, ScheduledClient
+
+
+class FakeClock:
+    """Time that only moves when the client sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestScheduledClient(unittest.TestCase):
+    def scheduled(self, failures, deadline_s=60.0):
+        self.clock = FakeClock()
+        self.fake = FakeClient([[text("ok")]], errors=failures)
+        return ScheduledClient(self.fake, deadline_s=deadline_s, limiter=RateLimiter(None, None),
+                               max_retries=3, base_s=1.0, max_s=30.0,
+                               clock=self.clock, sleep=self.clock.sleep, rng=lambda: 0.5)
+
+    def generate(self, client):
+        contents = [types.Content(role="user", parts=[text("hi")])]
+        return client.models.generate_content(model="fake", contents=contents)
+
+    def test_retry_after_then_server_error_then_success(self):
+        client = self.scheduled([api_error(429, retry_after=2), api_error(503)])
+        self.assertEqual(self.generate(client).text, "ok")
+        # Retry-After plus jitter, then full jitter up to base * 2 for the second retry
+        self.assertEqual(self.clock.sleeps, [2.5, 1.0])
+        self.assertEqual((client.requests, client.retries), (3, 2))
+        self.assertEqual(client.backoff_s, 3.5)
+
+    def test_retry_after_past_the_deadline(self):
+        client = self.scheduled([api_error(429, retry_after=30)], deadline_s=10.0)
+        with self.assertRaises(DeadlineExceeded):
+            self.generate(client)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual((client.requests, client.retries), (1, 0))
+
+    def test_bad_request_is_not_retried(self):
+        client = self.scheduled([api_error(400)])
+        with self.assertRaises(errors.ClientError) as caught:
+            self.generate(client)
+        self.assertEqual(caught.exception.code, 400)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual((client.requests, client.retries), (1, 0))
+        self.assertEqual(self.fake.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
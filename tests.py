@@ -8,6 +8,7 @@ from unittest import result
 from functions.get_file_content import get_file_content
 from functions.get_files_info import get_files_info
 from functions.run_python import run_python_file
+from functions.search_code import search_code
 
 def run_tests():
     # # Should print the calculator's usage instructions
@@ -33,6 +34,9 @@ def run_tests():
     #print get_file_content(".","./"))
     print(get_files_info("./"))
 
+    # Should find the precedence table in calculator.py with line numbers
+    print(search_code("calculator", "self.precedence", context=1))
+
 
 
 if __name__ == "__main__":